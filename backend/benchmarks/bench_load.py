@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Mixed widget + admin load against the app running in-process.
+
+Boots server.app (lifespan included) on a local mongod, or on mongomock-motor
+with --mock, seeds a synthetic catalog, profiles, responses and events, then
+drives it through httpx's ASGI transport for --seconds:
+
+  - --visitors concurrent shopper loops, each a fresh session that views a
+    product, saves a taste profile, asks for taste-fit scores on a product
+    grid, opens the form and sometimes submits a response
+  - --admins concurrent dashboard loops over products, summary, segments,
+    funnel and the response browser
+
+Throughput and p50/p95/p99 are reported per route and written to --out as
+JSON. Pass --baseline with an earlier results file to print the deltas; the
+exit status is 1 when any route's p95 regressed by more than --tolerance.
+
+mongomock-motor keeps the harness runnable anywhere, but its latencies say
+nothing about Mongo itself: compare runs only against the same backend.
+
+Usage: python backend/benchmarks/bench_load.py --mock --seconds 20 --out load.json [--baseline previous.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import server  # noqa: E402
+
+TAGS = ["fruity", "floral", "chocolatey", "nutty", "citrus", "berry", "caramel", "winey"]
+FIT_TAGS = ["too_acidic", "too_bitter", "perfect_balance", "too_light"]
+MODES = ["tasted", "preference_only"]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def random_profile(session_id, rng):
+    return {"session_id": session_id, **{f"{attr}_pref_1to9": rng.randint(1, 9) for attr in server.SENSORY_ATTRS}}
+
+
+def random_response(session_id, product_id, rng):
+    mode = rng.choice(MODES)
+    doc = {"session_id": session_id, "product_id": product_id, "mode": mode}
+    for attr in server.RESPONSE_ATTRS:
+        if mode == "tasted" or rng.random() < 0.5:
+            doc[attr] = rng.randint(1, 9)
+    if rng.random() < 0.2:
+        doc["notes"] = "lovely cup"
+    doc["standout_tags"] = rng.sample(TAGS, rng.randint(0, 3)) or None
+    doc["fit_tags"] = rng.sample(FIT_TAGS, rng.randint(0, 2)) or None
+    return doc
+
+
+async def seed(db, args, rng):
+    """Synthetic history so admin reads have something to aggregate."""
+    now = datetime.now(timezone.utc)
+    product_ids = [f"bench-{i}" for i in range(args.products)]
+    await db.products.insert_many([{
+        "product_id": pid,
+        "name": pid,
+        "sensory": {attr: rng.randint(1, 9) for attr in server.SENSORY_ATTRS},
+        "active": True,
+        "updated_at": now,
+    } for pid in product_ids])
+
+    await db.consumer_taste_profiles.insert_many([{
+        **random_profile(f"seed-{i}", rng),
+        "updated_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+    } for i in range(args.seed_profiles)])
+
+    for start in range(0, args.seed_responses, 5000):
+        batch = []
+        for i in range(start, min(start + 5000, args.seed_responses)):
+            doc = random_response(f"seed-{i % max(args.seed_profiles, 1)}", rng.choice(product_ids), rng)
+            doc.update(response_id=str(uuid.uuid4()), created_at=now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)))
+            batch.append(doc)
+        await db.product_affective_responses.insert_many(batch, ordered=False)
+        for doc in batch:
+            await server.record_rollup(doc)
+
+    for start in range(0, args.seed_events, 5000):
+        await db.events.insert_many([
+            server.event_doc(rng.choice(server.FUNNEL_STEPS), f"seed-{i % max(args.seed_profiles, 1)}",
+                             product_id=rng.choice(product_ids))
+            for i in range(start, min(start + 5000, args.seed_events))
+        ], ordered=False)
+    await server.catalog_index.refresh(db)
+    return product_ids
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, client, route, method, path, **kwargs):
+        start = time.perf_counter()
+        res = await client.request(method, path, **kwargs)
+        self.samples[route].append((time.perf_counter() - start) * 1000)
+        if res.status_code >= 400:
+            self.errors[route] += 1
+        return res
+
+
+async def visitor_loop(client, recorder, product_ids, rng, deadline):
+    while time.perf_counter() < deadline:
+        session_id = str(uuid.uuid4())
+        product_id = rng.choice(product_ids)
+
+        async def event(name):
+            await recorder.call(client, "POST /api/events", "POST", "/api/events",
+                                json={"event_name": name, "session_id": session_id, "product_id": product_id})
+
+        await event("product_viewed")
+        await recorder.call(client, "POST /api/affective/profile", "POST", "/api/affective/profile",
+                            json=random_profile(session_id, rng))
+        grid = rng.sample(product_ids, min(24, len(product_ids)))
+        await recorder.call(client, "POST /api/affective/taste-fit/batch", "POST", "/api/affective/taste-fit/batch",
+                            json={"session_id": session_id, "products": [{"product_id": pid} for pid in grid]})
+        await event("affective_form_viewed")
+        if rng.random() < 0.5:
+            await event("affective_form_opened")
+            if rng.random() < 0.6:
+                await recorder.call(client, "POST /api/affective/response", "POST", "/api/affective/response",
+                                    json=random_response(session_id, product_id, rng))
+                await event("affective_form_submitted")
+        # In-process calls on mongomock can complete without ever suspending; let other loops run
+        await asyncio.sleep(0)
+
+
+async def admin_loop(client, recorder, product_ids, rng, deadline):
+    res = await client.post("/api/auth/login", json={"email": server.ADMIN_EMAIL, "password": server.ADMIN_PASSWORD})
+    headers = {"Authorization": f"Bearer {res.json()['token']}"}
+    reads = [
+        ("GET /api/admin/products", lambda: "/api/admin/products"),
+        ("GET /api/admin/products/summary", lambda: f"/api/admin/products/summary?product_id={rng.choice(product_ids)}"),
+        ("GET /api/admin/segments", lambda: "/api/admin/segments"),
+        ("GET /api/admin/funnel", lambda: "/api/admin/funnel?by_product=true"),
+        ("GET /api/admin/responses", lambda: f"/api/admin/responses?product_id={rng.choice(product_ids)}&limit=50"),
+    ]
+    while time.perf_counter() < deadline:
+        route, path = rng.choice(reads)
+        await recorder.call(client, route, "GET", path(), headers=headers)
+        await asyncio.sleep(0.05)
+
+
+def summarize(recorder, seconds):
+    routes = {}
+    for route, samples in sorted(recorder.samples.items()):
+        routes[route] = {
+            "requests": len(samples),
+            "errors": recorder.errors[route],
+            "rps": round(len(samples) / seconds, 1),
+            "p50_ms": round(statistics.median(samples), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "p99_ms": round(percentile(samples, 99), 2),
+        }
+    return routes
+
+
+def report(routes, baseline=None):
+    print(f"{'route':<38} {'n':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for route, r in routes.items():
+        line = (f"{route:<38} {r['requests']:>7} {r['errors']:>5} {r['rps']:>8.1f} "
+                f"{r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms {r['p99_ms']:>7.1f}ms")
+        if baseline and route in baseline:
+            line += f"  p95 {(r['p95_ms'] / baseline[route]['p95_ms'] - 1) * 100:+6.1f}%"
+        print(line)
+
+
+def regressions(routes, baseline, tolerance):
+    return [route for route, r in routes.items()
+            if route in baseline and r["p95_ms"] > baseline[route]["p95_ms"] * (1 + tolerance)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mock", action="store_true", help="use mongomock-motor instead of a real mongod")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="load_bench", help="scratch database, dropped before seeding")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--visitors", type=int, default=20, help="concurrent shopper loops")
+    parser.add_argument("--admins", type=int, default=2, help="concurrent dashboard loops")
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--seed-profiles", type=int, default=5000)
+    parser.add_argument("--seed-responses", type=int, default=20000)
+    parser.add_argument("--seed-events", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=7, help="random seed for data and traffic")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth before failing")
+    args = parser.parse_args()
+
+    if args.mock:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--mock needs mongomock-motor: pip install mongomock-motor")
+        server.AsyncIOMotorClient = AsyncMongoMockClient
+    else:
+        scratch = server.AsyncIOMotorClient(args.mongo_url)
+        await scratch.drop_database(args.db)
+        scratch.close()
+    server.MONGO_URL = args.mongo_url
+    server.DB_NAME = args.db
+    # The scratch database gets its own admin; tokens only need to round-trip in-process
+    server.JWT_SECRET = server.JWT_SECRET or "load-bench"
+    server.ADMIN_EMAIL = server.ADMIN_EMAIL or "bench@unchainedcoffee.com"
+    server.ADMIN_PASSWORD = server.ADMIN_PASSWORD or "bench"
+
+    rng = random.Random(args.seed)
+    async with server.lifespan(server.app):
+        start = time.perf_counter()
+        product_ids = await seed(server.db, args, rng)
+        print(f"seeded {args.products} products, {args.seed_profiles:,} profiles, {args.seed_responses:,} responses, "
+              f"{args.seed_events:,} events in {time.perf_counter() - start:.1f}s")
+
+        recorder = Recorder()
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            started = time.perf_counter()
+            deadline = started + args.seconds
+            await asyncio.gather(
+                *(visitor_loop(client, recorder, product_ids, random.Random(args.seed + i), deadline)
+                  for i in range(args.visitors)),
+                *(admin_loop(client, recorder, product_ids, random.Random(-args.seed - i), deadline)
+                  for i in range(args.admins)),
+            )
+            elapsed = time.perf_counter() - started
+
+    routes = summarize(recorder, elapsed)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["routes"]
+    report(routes, baseline)
+
+    if args.out:
+        results = {
+            "run_at": datetime.now(timezone.utc).isoformat(),
+            "backend": "mongomock" if args.mock else "mongod",
+            "python": platform.python_version(),
+            "args": vars(args),
+            "seconds": round(elapsed, 2),
+            "routes": routes,
+        }
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.out}")
+
+    if baseline:
+        regressed = regressions(routes, baseline, args.tolerance)
+        if regressed:
+            print(f"p95 regressed more than {args.tolerance:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Public endpoint latency during a login storm.
+
+Measures p50/p95/p99 of GET /api/health and GET /api/affective/profile on a
+running server, first at rest and then while --logins concurrent login loops
+hammer POST /api/auth/login. With bcrypt on the event loop the public p99
+climbs to roughly one hash time per queued login; off the loop it stays flat.
+
+Usage: python backend/benchmarks/bench_login_storm.py --base-url http://localhost:8001
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def probe_public(client, session_id, seconds):
+    samples = []
+    deadline = time.perf_counter() + seconds
+    paths = ["/api/health", f"/api/affective/profile?session_id={session_id}"]
+    while time.perf_counter() < deadline:
+        for path in paths:
+            start = time.perf_counter()
+            await client.get(path)
+            samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+    return samples
+
+
+async def login_loop(client, email, password, stop, counts):
+    while not stop.is_set():
+        res = await client.post("/api/auth/login", json={"email": email, "password": password})
+        counts[res.status_code] = counts.get(res.status_code, 0) + 1
+
+
+def report(label, samples):
+    print(f"{label:<14} n={len(samples):<6} p50={statistics.median(samples):7.1f}ms "
+          f"p95={percentile(samples, 95):7.1f}ms p99={percentile(samples, 99):7.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=os.environ.get("BENCH_BASE_URL", "http://localhost:8001"))
+    parser.add_argument("--email", default="admin@unchainedcoffee.com")
+    parser.add_argument("--password", default="unchained2025")
+    parser.add_argument("--logins", type=int, default=20, help="concurrent login loops")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    session_id = str(uuid.uuid4())
+    limits = httpx.Limits(max_connections=args.logins + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        report("idle", await probe_public(client, session_id, args.seconds))
+
+        stop = asyncio.Event()
+        counts = {}
+        storm = [asyncio.create_task(login_loop(client, args.email, args.password, stop, counts))
+                 for _ in range(args.logins)]
+        await asyncio.sleep(1)
+        samples = await probe_public(client, session_id, args.seconds)
+        stop.set()
+        await asyncio.gather(*storm)
+        report("login storm", samples)
+        print(f"login responses by status: {dict(sorted(counts.items()))}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
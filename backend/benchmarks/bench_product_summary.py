@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Product summary at volume: $facet pipeline vs fetching every response into Python.
+
+Seeds --responses synthetic responses for one product into a scratch database
+on MONGO_URL (a real mongod), then times summarize_responses against the old
+fetch-and-loop approach and checks that both agree.
+
+Usage: MONGO_URL=mongodb://localhost:27017 python backend/benchmarks/bench_product_summary.py --responses 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+import server  # noqa: E402
+
+TAGS = ["fruity", "floral", "chocolatey", "nutty", "citrus", "berry", "caramel", "winey"]
+FIT_TAGS = ["too_acidic", "too_bitter", "perfect_balance", "too_light"]
+
+
+def make_response(i, rng):
+    tasted = rng.random() < 0.6
+    doc = {
+        "response_id": f"bench-{i}",
+        "session_id": f"session-{i % 50000}",
+        "product_id": "bench-product",
+        "mode": "tasted" if tasted else "preference_only",
+        "notes": "lovely cup" if rng.random() < 0.2 else None,
+        "standout_tags": rng.sample(TAGS, rng.randint(0, 3)) or None,
+        "fit_tags": rng.sample(FIT_TAGS, rng.randint(0, 2)) or None,
+        "created_at": datetime(2026, rng.randint(1, 12), rng.randint(1, 28), 12, tzinfo=timezone.utc),
+    }
+    for attr in server.RESPONSE_ATTRS:
+        doc[attr] = rng.randint(1, 9) if tasted or rng.random() < 0.5 else None
+    return doc
+
+
+async def seed(collection, n, rng):
+    await collection.drop()
+    batch = []
+    for i in range(n):
+        batch.append(make_response(i, rng))
+        if len(batch) == 10000:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+    await collection.create_index([("product_id", 1), ("created_at", 1)])
+
+
+async def legacy_summary(collection, query):
+    responses = await collection.find(query, {"_id": 0}).to_list(None)
+    averages, distributions = {}, {}
+    for attr in server.RESPONSE_ATTRS:
+        values = [r[attr] for r in responses if r.get(attr) is not None]
+        if values:
+            averages[attr] = round(sum(values) / len(values), 2)
+            dist = {str(i): 0 for i in range(1, 10)}
+            for v in values:
+                dist[str(v)] += 1
+            distributions[attr] = dist
+    tag_counts, fit_tag_counts, mode_counts = defaultdict(int), defaultdict(int), defaultdict(int)
+    for r in responses:
+        for t in (r.get("standout_tags") or []):
+            tag_counts[t] += 1
+        for t in (r.get("fit_tags") or []):
+            fit_tag_counts[t] += 1
+        mode_counts[r.get("mode", "unknown")] += 1
+    return {
+        "count": len(responses),
+        "averages": averages,
+        "distributions": distributions,
+        "standout_tags": dict(tag_counts),
+        "fit_tags": dict(fit_tag_counts),
+        "notes_count": sum(1 for r in responses if r.get("notes")),
+        "mode_breakdown": dict(mode_counts),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", type=int, default=1000000)
+    parser.add_argument("--db", default="taste_fit_bench")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse data from a previous run")
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the pipeline")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    server.db = client[args.db]
+    collection = server.db.product_affective_responses
+    if not args.skip_seed:
+        start = time.perf_counter()
+        await seed(collection, args.responses, random.Random(7))
+        print(f"seeded {args.responses:,} responses in {time.perf_counter() - start:.1f}s")
+
+    query = {"product_id": "bench-product"}
+    start = time.perf_counter()
+    summary = await server.summarize_responses(query)
+    print(f"pipeline: {time.perf_counter() - start:8.2f}s  count={summary['count']:,}")
+
+    if not args.skip_legacy:
+        start = time.perf_counter()
+        legacy = await legacy_summary(collection, query)
+        print(f"legacy:   {time.perf_counter() - start:8.2f}s  count={legacy['count']:,}")
+        assert legacy == summary, "pipeline and legacy summaries differ"
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Taste-fit scoring throughput: scalar compute_fit_score loop vs the vectorized engine.
+
+Usage: python backend/benchmarks/bench_taste_fit.py [--sizes 10 1000 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from server import (  # noqa: E402
+    SENSORY_ATTRS, compute_fit_score, compute_fit_scores, profile_vector,
+    score_fit_matrix, sensory_matrix,
+)
+
+
+def make_products(n, rng):
+    products = []
+    for _ in range(n):
+        sensory = {attr: rng.randint(1, 9) for attr in SENSORY_ATTRS}
+        # A few sparse products so the missing-attribute path is exercised too
+        if rng.random() < 0.05:
+            del sensory[rng.choice(SENSORY_ATTRS)]
+        products.append(sensory)
+    return products
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    profile = {f"{attr}_pref_1to9": rng.randint(1, 9) for attr in SENSORY_ATTRS}
+
+    print(f"{'products':>10} {'scalar/s':>14} {'vector/s':>14} {'arrays/s':>14} {'speedup':>9}")
+    for n in args.sizes:
+        products = make_products(n, rng)
+        expected = [compute_fit_score(profile, p) for p in products]
+        assert compute_fit_scores(profile, products) == expected, f"mismatch at n={n}"
+
+        repeat = max(1, min(50, 100000 // n))
+        scalar = timed(lambda: [compute_fit_score(profile, p) for p in products], repeat)
+        vector = timed(lambda: compute_fit_scores(profile, products), repeat)
+        matrix = sensory_matrix(products)
+        pref = profile_vector(profile)
+        arrays = timed(lambda: score_fit_matrix(pref, matrix), repeat)
+        print(f"{n:>10} {n / scalar:>14,.0f} {n / vector:>14,.0f} {n / arrays:>14,.0f} "
+              f"{scalar / vector:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
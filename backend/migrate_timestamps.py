@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Convert legacy ISO-string timestamps to native BSON dates.
+
+Rewrites every timestamp field still stored as a string, in batches, with a
+read throttle so it can run against a live database. It only touches string
+values, so it is safe to re-run or interrupt. Once it reports nothing left to
+convert, set LEGACY_STRING_TIMESTAMPS=false so range filters stop matching the
+string form.
+
+Usage: python backend/migrate_timestamps.py [--dry-run] [--batch-size 1000] [--rate 20000]
+"""
+import argparse
+import asyncio
+import time
+
+from pymongo import UpdateOne
+
+import server
+from server import as_datetime
+
+TIMESTAMP_FIELDS = [
+    ("events", "event_time"),
+    ("product_affective_responses", "created_at"),
+    ("consumer_taste_profiles", "updated_at"),
+    ("products", "updated_at"),
+    ("product_daily_stats", "last_response"),
+    ("product_response_stats", "last_response"),
+    ("admin_users", "created_at"),
+]
+
+
+async def migrate_field(collection, field, batch_size, rate, dry_run):
+    query = {field: {"$type": "string"}}
+    remaining = await collection.count_documents(query)
+    print(f"{collection.name}.{field}: {remaining:,} string values", flush=True)
+    if dry_run or not remaining:
+        return remaining
+
+    converted = 0
+    start = time.monotonic()
+    while True:
+        docs = await collection.find(query, {field: 1}).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+        await collection.bulk_write(
+            [UpdateOne({"_id": d["_id"], field: d[field]}, {"$set": {field: as_datetime(d[field])}})
+             for d in docs],
+            ordered=False
+        )
+        converted += len(docs)
+        ahead = converted / rate - (time.monotonic() - start)
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+        print(f"  {converted:,}/{remaining:,}", flush=True)
+    return converted
+
+
+async def run(args):
+    client = server.AsyncIOMotorClient(server.MONGO_URL, tz_aware=True)
+    db = client[server.DB_NAME]
+    total = 0
+    for collection, field in TIMESTAMP_FIELDS:
+        total += await migrate_field(db[collection], field, args.batch_size, args.rate, args.dry_run)
+    print(f"{'would convert' if args.dry_run else 'converted'} {total:,} values")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=20000, help="max documents rewritten per second")
+    parser.add_argument("--dry-run", action="store_true", help="only count string timestamps")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Rebuild product_daily_stats from raw product_affective_responses.
+
+Raw responses are split into date-range shards that are aggregated in parallel
+into a staging collection, which is then renamed over the live rollups in one
+step. Progress is checkpointed per shard in rollup_rebuilds and then per phase
+(staged, swapped, done), so --resume picks up an interrupted run without ever
+renaming an empty staging collection over the live one. Reads are throttled
+with --rate so live traffic keeps its share of Mongo.
+
+Today's responses keep arriving while the rebuild runs, so the staged
+collections only cover whole days before the cutoff. The per-product totals in
+product_response_stats are derived from the staged daily rollups, and both are
+swapped in together. Everything from the cutoff day up to a high-water mark
+taken just before each swap is then replayed into the live collections as $inc,
+on top of whatever record_rollup has added since: nothing live is overwritten.
+The only responses that can be miscounted are ones whose insert and rollup
+write straddle the swap itself.
+
+Usage: python backend/rebuild_rollups.py [--workers 4] [--shard-days 7] [--rate 20000] [--resume]
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from pymongo import ReplaceOne, UpdateOne
+
+import server
+from server import as_datetime, rollup_filter, rollup_increments, time_query, utc_day
+
+TARGET = "product_daily_stats"
+SOURCE = "product_affective_responses"
+STAGING = f"{TARGET}__rebuild"
+TOTALS = "product_response_stats"
+
+
+def set_path(doc, path, value):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+
+class RollupBuilder:
+    """Folds raw responses into full rollup documents, one per (product_id, day, mode)."""
+
+    def __init__(self):
+        self.rollups = {}
+
+    def add(self, r):
+        key = rollup_filter(r)
+        entry = self.rollups.get(tuple(key.values()))
+        if entry is None:
+            entry = self.rollups[tuple(key.values())] = {"key": key, "inc": defaultdict(int), "last": None}
+        for path, v in rollup_increments(r).items():
+            entry["inc"][path] += v
+        created_at = as_datetime(r["created_at"])
+        if entry["last"] is None or created_at > entry["last"]:
+            entry["last"] = created_at
+
+    def documents(self):
+        for entry in self.rollups.values():
+            doc = dict(entry["key"])
+            for path, v in entry["inc"].items():
+                set_path(doc, path, v)
+            doc["last_response"] = entry["last"]
+            yield doc
+
+
+class Throttle:
+    """Caps documents read per second across all shard workers."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.start = time.monotonic()
+        self.read = 0
+
+    async def consume(self, n):
+        self.read += n
+        ahead = self.read / self.rate - (time.monotonic() - self.start)
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+
+
+class Progress:
+    def __init__(self, shards):
+        self.shards = shards
+        self.done = 0
+        self.docs = 0
+        self.start = time.monotonic()
+        self.last_report = 0
+
+    def report(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_report < 5:
+            return
+        self.last_report = now
+        elapsed = max(now - self.start, 1e-9)
+        print(f"[{elapsed:7.1f}s] shards {self.done}/{self.shards}  responses {self.docs:,}  "
+              f"{self.docs / elapsed:,.0f}/s", flush=True)
+
+
+def day_start(day):
+    return datetime.fromisoformat(day).replace(tzinfo=timezone.utc)
+
+
+def day_shards(first_day, end_day, shard_days):
+    shards = []
+    start = first_day
+    while start < end_day:
+        end = min(start + timedelta(days=shard_days), end_day)
+        shards.append((start.isoformat(), end.isoformat()))
+        start = end
+    return shards
+
+
+async def fold_responses(db, source_query, throttle, progress, batch_size):
+    """Read one range of responses into a RollupBuilder."""
+    builder = RollupBuilder()
+    read = 0
+    projection = {f: 1 for f in ("product_id", "mode", "created_at", "notes", "standout_tags", "fit_tags",
+                                 *server.RESPONSE_ATTRS)}
+    cursor = db[SOURCE].find(source_query, {"_id": 0, **projection})
+    async for r in cursor.batch_size(batch_size):
+        builder.add(r)
+        read += 1
+        if read % batch_size == 0:
+            await throttle.consume(batch_size)
+            progress.docs += batch_size
+            progress.report()
+    await throttle.consume(read % batch_size)
+    progress.docs += read % batch_size
+    return builder
+
+
+async def rebuild_days(db, source_query, target, throttle, progress, batch_size):
+    """Aggregate one day range of responses and replace its rollup documents in target."""
+    builder = await fold_responses(db, source_query, throttle, progress, batch_size)
+    docs = list(builder.documents())
+    for i in range(0, len(docs), batch_size):
+        await db[target].bulk_write([
+            ReplaceOne({"product_id": d["product_id"], "day": d["day"], "mode": d["mode"]}, d, upsert=True)
+            for d in docs[i:i + batch_size]
+        ], ordered=False)
+    return docs
+
+
+async def stage_totals(db, staging):
+    """Derive product_response_stats from the staged daily rollups into staging."""
+    await db[STAGING].aggregate([
+        {"$group": {
+            "_id": "$product_id",
+            "response_count": {"$sum": "$count"},
+            "last_response": {"$max": "$last_response"},
+            "modes": {"$addToSet": "$mode"}
+        }},
+        {"$project": {
+            "_id": 0,
+            "product_id": "$_id",
+            "product_id_lower": {"$toLower": "$_id"},
+            "response_count": 1,
+            "last_response": 1,
+            "modes": 1
+        }},
+        {"$out": staging}
+    ]).to_list(None)
+    await db[staging].create_index("product_id", unique=True)
+    await db[staging].create_index("product_id_lower")
+    await db[staging].create_index([("last_response", -1), ("product_id", 1)])
+    await db[staging].create_index([("response_count", -1), ("product_id", 1)])
+
+
+def daily_merges(entries):
+    return [
+        UpdateOne(e["key"], {"$inc": dict(e["inc"]), "$max": {"last_response": e["last"]}}, upsert=True)
+        for e in entries
+    ]
+
+
+def totals_merges(entries):
+    totals = {}
+    for e in entries:
+        total = totals.setdefault(e["key"]["product_id"], {"count": 0, "last": e["last"], "modes": set()})
+        total["count"] += e["inc"]["count"]
+        total["last"] = max(total["last"], e["last"])
+        total["modes"].add(e["key"]["mode"])
+    return [
+        UpdateOne({"product_id": product_id}, {
+            "$inc": {"response_count": t["count"]},
+            "$max": {"last_response": t["last"]},
+            "$addToSet": {"modes": {"$each": sorted(t["modes"])}},
+            "$setOnInsert": {"product_id_lower": product_id.lower()}
+        }, upsert=True)
+        for product_id, t in sorted(totals.items())
+    ]
+
+
+async def run(args):
+    client = server.AsyncIOMotorClient(server.MONGO_URL, tz_aware=True)
+    db = client[server.DB_NAME]
+    checkpoints = db.rollup_rebuilds
+    totals_staging = f"{TOTALS}__rebuild"
+
+    today = datetime.now(timezone.utc).date()
+    checkpoint = await checkpoints.find_one({"_id": TARGET}) if args.resume else None
+    if checkpoint and checkpoint["status"] in ("running", "staged", "swapped"):
+        print(f"Resuming {checkpoint['status']} rebuild started {checkpoint['started_at']} "
+              f"({len(checkpoint['shards_done'])} shards already done)")
+        cutoff = date.fromisoformat(checkpoint["cutoff_day"])
+    else:
+        cutoff = today
+        # Legacy string timestamps sort apart from BSON dates, so take the earliest of each
+        firsts = []
+        for bson_type in ("date", "string"):
+            firsts += await db[SOURCE].find({"created_at": {"$type": bson_type}}, {"created_at": 1}) \
+                .sort("created_at", 1).limit(1).to_list(1)
+        first_day = min((date.fromisoformat(utc_day(f["created_at"])) for f in firsts), default=cutoff)
+        await db[STAGING].drop()
+        checkpoint = {
+            "_id": TARGET,
+            "status": "running",
+            "started_at": datetime.now(timezone.utc),
+            "cutoff_day": cutoff.isoformat(),
+            "first_day": first_day.isoformat(),
+            "shards_done": [],
+        }
+        await checkpoints.replace_one({"_id": TARGET}, checkpoint, upsert=True)
+
+    async def advance(status):
+        checkpoint["status"] = status
+        await checkpoints.update_one({"_id": TARGET}, {"$set": {"status": status}})
+
+    shards = day_shards(date.fromisoformat(checkpoint["first_day"]), cutoff, args.shard_days)
+    pending = [s for s in shards if s[0] not in checkpoint["shards_done"]]
+    progress = Progress(len(shards))
+    progress.done = len(shards) - len(pending)
+    throttle = Throttle(args.rate)
+    slots = asyncio.Semaphore(args.workers)
+
+    async def run_shard(start, end):
+        async with slots:
+            query = time_query("created_at", {"$gte": day_start(start), "$lt": day_start(end)})
+            await rebuild_days(db, query, STAGING, throttle, progress, args.batch_size)
+            await checkpoints.update_one({"_id": TARGET}, {"$addToSet": {"shards_done": start}})
+            progress.done += 1
+            progress.report()
+
+    if checkpoint["status"] == "running":
+        if checkpoint["shards_done"] and await db[STAGING].find_one({}, {"_id": 1}) is None:
+            raise SystemExit(f"{STAGING} is gone but the checkpoint has finished shards; rerun without --resume")
+        await db[STAGING].create_index([("product_id", 1), ("day", 1), ("mode", 1)], unique=True)
+        await asyncio.gather(*(run_shard(start, end) for start, end in pending))
+        progress.report(force=True)
+        await stage_totals(db, totals_staging)
+        await advance("staged")
+
+    if checkpoint["status"] == "staged":
+        # Each collection gets its own high-water mark taken just before its swap: responses created
+        # before it are replayed below, record_rollup lands anything after it in the new collection.
+        # The mark is saved before the rename, so a resume can tell a finished swap by its missing staging.
+        marks = checkpoint.setdefault("marks", {})
+        existing = await db.list_collection_names()
+        for staging, target in ((STAGING, TARGET), (totals_staging, TOTALS)):
+            if target in marks and staging not in existing:
+                continue
+            marks[target] = datetime.now(timezone.utc)
+            await checkpoints.update_one({"_id": TARGET}, {"$set": {f"marks.{target}": marks[target]}})
+            await client.admin.command("renameCollection", f"{server.DB_NAME}.{staging}",
+                                       to=f"{server.DB_NAME}.{target}", dropTarget=True)
+        await advance("swapped")
+
+    if checkpoint["status"] == "swapped":
+        marks = checkpoint["marks"]
+        live = await fold_responses(
+            db, time_query("created_at", {"$gte": day_start(cutoff.isoformat()), "$lt": marks[TARGET]}),
+            throttle, progress, args.batch_size)
+        between = await fold_responses(
+            db, time_query("created_at", {"$gte": marks[TARGET], "$lt": marks[TOTALS]}),
+            throttle, progress, args.batch_size)
+        entries = [e for _, e in sorted(live.rollups.items())]
+        merged = checkpoint.get("merged", {})
+        for target, ops in ((TARGET, daily_merges(entries)),
+                            (TOTALS, totals_merges([*entries, *between.rollups.values()]))):
+            # Batches already applied are skipped on resume rather than $inc'd twice
+            for i in range(merged.get(target, 0), len(ops), args.batch_size):
+                await db[target].bulk_write(ops[i:i + args.batch_size], ordered=False)
+                await checkpoints.update_one({"_id": TARGET}, {"$set": {f"merged.{target}": i + args.batch_size}})
+        await checkpoints.update_one({"_id": TARGET}, {"$set": {
+            "status": "done", "finished_at": datetime.now(timezone.utc)
+        }})
+    progress.report(force=True)
+    print(f"{TARGET} rebuilt from {progress.docs:,} responses")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="shards processed concurrently")
+    parser.add_argument("--shard-days", type=int, default=7, help="days of responses per shard")
+    parser.add_argument("--rate", type=float, default=20000, help="max responses read per second")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--resume", action="store_true", help="continue the last interrupted rebuild")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,73 +1,189 @@
 import os
 import uuid
+import time
+import asyncio
+import logging
 import html
 import re
 import csv
 import io
+import json
+import base64
+import hashlib
+import random
+import cProfile
+import pstats
+import marshal
+import threading
+from bisect import bisect_left
 from datetime import datetime, timezone, timedelta
+from email.utils import format_datetime
 from typing import Optional, List
 from contextlib import asynccontextmanager
-from collections import defaultdict
+from urllib.parse import unquote
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict, OrderedDict, deque
 
+import numpy as np
 from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field, field_validator
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, field_validator
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
+from pymongo import ReturnDocument, monitoring
+from pymongo.errors import BulkWriteError
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only the columnar exports need it
+    pa = None
+
 MONGO_URL = os.environ.get("MONGO_URL")
 DB_NAME = os.environ.get("DB_NAME")
 JWT_SECRET = os.environ.get("JWT_SECRET")
 ADMIN_EMAIL = os.environ.get("ADMIN_EMAIL")
 ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD")
+CATALOG_REFRESH_SECONDS = float(os.environ.get("CATALOG_REFRESH_SECONDS", "30"))
+CATALOG_REFRESH_LOOKBACK_SECONDS = float(os.environ.get("CATALOG_REFRESH_LOOKBACK_SECONDS", "120"))
+PROFILE_CACHE_SIZE = int(os.environ.get("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL_SECONDS = float(os.environ.get("PROFILE_CACHE_TTL_SECONDS", "60"))
+EVENT_BATCH_SIZE = int(os.environ.get("EVENT_BATCH_SIZE", "500"))
+EVENT_FLUSH_INTERVAL_SECONDS = float(os.environ.get("EVENT_FLUSH_INTERVAL_SECONDS", "1"))
+EVENT_QUEUE_MAX = int(os.environ.get("EVENT_QUEUE_MAX", "50000"))
+EVENT_ENQUEUE_TIMEOUT_SECONDS = float(os.environ.get("EVENT_ENQUEUE_TIMEOUT_SECONDS", "5"))
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_WINDOW_SECONDS = 86400
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "32"))
+# Serve summaries from product_daily_stats and the product list from product_response_stats
+# (the only indexed search/sort path); enable once rebuild_rollups.py has backfilled both
+ROLLUP_READS = os.environ.get("ROLLUP_READS", "false").lower() == "true"
+# Also match ISO-string timestamps in range filters; turn off once migrate_timestamps.py has run
+LEGACY_STRING_TIMESTAMPS = os.environ.get("LEGACY_STRING_TIMESTAMPS", "true").lower() == "true"
+ADMIN_CACHE_TTL_SECONDS = float(os.environ.get("ADMIN_CACHE_TTL_SECONDS", "30"))
+# Let viewer-level read endpoints trust the signed role claim instead of loading the user
+ADMIN_TRUST_TOKEN_CLAIMS = os.environ.get("ADMIN_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+# When set, GET /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+# Request profiling: off unless enabled, then admins opt in per request with
+# "X-Request-Profile: 1" or ?request_profile=1, and REQUEST_PROFILE_SAMPLE_RATE of all requests are profiled
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+REQUEST_PROFILE_SAMPLE_RATE = float(os.environ.get("REQUEST_PROFILE_SAMPLE_RATE", "0"))
+REQUEST_PROFILE_BUFFER_SIZE = int(os.environ.get("REQUEST_PROFILE_BUFFER_SIZE", "50"))
+# Mongo commands at or above this duration are recorded by query shape for the index report
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_MAX_SHAPES = int(os.environ.get("SLOW_QUERY_MAX_SHAPES", "200"))
+PRIVACY_DELETE_BATCH_SIZE = int(os.environ.get("PRIVACY_DELETE_BATCH_SIZE", "1000"))
+# Pause between batches per collection, so deletion jobs leave Mongo to live traffic
+PRIVACY_DELETE_PAUSE_SECONDS = float(os.environ.get("PRIVACY_DELETE_PAUSE_SECONDS", "0.05"))
+PRIVACY_DELETE_LEASE_SECONDS = float(os.environ.get("PRIVACY_DELETE_LEASE_SECONDS", "60"))
+# How often every worker checks for finished deletions and drops its cached profiles
+PRIVACY_CACHE_SYNC_SECONDS = float(os.environ.get("PRIVACY_CACHE_SYNC_SECONDS", "5"))
+
+logger = logging.getLogger("taste_fit")
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-rate_limits = {}
+# bcrypt releases the GIL, so a small thread pool keeps it off the event loop
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+password_slots = asyncio.Semaphore(PASSWORD_HASH_MAX_PENDING)
 
 client = None
 db = None
 
 
+async def run_password_work(fn, *args):
+    """Run a bcrypt call on the password pool; shed load once too many are queued."""
+    if password_slots.locked():
+        raise HTTPException(503, "Too many concurrent logins, retry shortly")
+    async with password_slots:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, fn, *args)
+
+
+async def hash_password(password):
+    return await run_password_work(pwd_context.hash, password)
+
+
+async def verify_password(password, password_hash):
+    return await run_password_work(pwd_context.verify, password, password_hash)
+
+
 async def seed_admin():
     existing = await db.admin_users.find_one({"email": ADMIN_EMAIL})
     if not existing:
         await db.admin_users.insert_one({
             "user_id": str(uuid.uuid4()),
             "email": ADMIN_EMAIL,
-            "password_hash": pwd_context.hash(ADMIN_PASSWORD),
+            "password_hash": await hash_password(ADMIN_PASSWORD),
             "role": "admin",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
         await db.admin_users.insert_one({
             "user_id": str(uuid.uuid4()),
             "email": "viewer@unchainedcoffee.com",
-            "password_hash": pwd_context.hash("viewer2025"),
+            "password_hash": await hash_password("viewer2025"),
             "role": "viewer",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
 
 
+async def drop_stale_index(collection, name, **options):
+    """Drop an index an earlier deploy created unless it already has these options."""
+    info = (await collection.index_information()).get(name)
+    if info and (not options or any(info.get(k) != v for k, v in options.items())):
+        await collection.drop_index(name)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global client, db
-    client = AsyncIOMotorClient(MONGO_URL)
+    global client, db, rate_limiter
+    client = AsyncIOMotorClient(MONGO_URL, tz_aware=True, event_listeners=[mongo_command_metrics, slow_query_log])
     db = client[DB_NAME]
     await db.events.create_index([("session_id", 1)])
     await db.events.create_index([("product_id", 1), ("event_time", 1)])
     await db.events.create_index([("event_name", 1), ("event_time", 1)])
+    # The planner only uses a partial index when the query implies its filter: {"consumer_id": x} implies
+    # a string range, never {"$type": "string"}. Events without a consumer store null and stay out of it.
+    consumer_filter = {"consumer_id": {"$gt": ""}}
+    await drop_stale_index(db.events, "consumer_id_1", partialFilterExpression=consumer_filter)
+    await db.events.create_index("consumer_id", partialFilterExpression=consumer_filter)
     await db.consumer_taste_profiles.create_index("session_id", unique=True, sparse=True)
     await db.consumer_taste_profiles.create_index("consumer_id", sparse=True)
     await db.consumer_taste_profiles.create_index("updated_at")
-    await db.product_affective_responses.create_index([("product_id", 1), ("created_at", 1)])
+    # Superseded by (product_id, created_at, response_id), which serves the same prefix
+    await drop_stale_index(db.product_affective_responses, "product_id_1_created_at_1")
     await db.product_affective_responses.create_index([("session_id", 1), ("created_at", 1)])
     await db.product_affective_responses.create_index([("consumer_id", 1), ("created_at", 1)])
+    await db.product_affective_responses.create_index([("product_id", 1), ("created_at", 1), ("response_id", 1)])
+    await db.product_affective_responses.create_index([("created_at", 1), ("response_id", 1)])
+    await db.product_daily_stats.create_index([("product_id", 1), ("day", 1), ("mode", 1)], unique=True)
+    await db.product_response_stats.create_index("product_id", unique=True)
+    await db.product_response_stats.create_index("product_id_lower")
+    await db.product_response_stats.create_index([("last_response", -1), ("product_id", 1)])
+    await db.product_response_stats.create_index([("response_count", -1), ("product_id", 1)])
+    await db.products.create_index("product_id", unique=True)
+    await db.products.create_index("updated_at")
+    await db.privacy_delete_jobs.create_index([("status", 1), ("created_at", 1)])
+    if RATE_LIMIT_BACKEND == "mongo":
+        await db.rate_limits.create_index("expires_at", expireAfterSeconds=0)
+        rate_limiter = MongoRateLimitBackend(db.rate_limits)
     await seed_admin()
+    await catalog_index.refresh(db)
+    catalog_task = asyncio.create_task(refresh_catalog_periodically())
+    event_ingestor.start(db.events)
+    privacy_deleter.start(db)
     yield
+    catalog_task.cancel()
+    await privacy_deleter.stop()
+    await event_ingestor.stop()
+    password_executor.shutdown(wait=False)
     client.close()
 
 
@@ -82,6 +198,313 @@ app.add_middleware(
 )
 
 
+# --- Metrics ---
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def metric_labels(names, values):
+    def escape(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{n}="{escape(v)}"' for n, v in zip(names, values))
+
+
+class Counter:
+    """Monotonic counter per label set, rendered in Prometheus text format."""
+
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = defaultdict(int)
+
+    def inc(self, labels, n=1):
+        self._values[labels] += n
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{{{metric_labels(self.labels, labels)}}} {value}"
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set.
+
+    observe() is a bisect plus three increments, cheap enough for every request.
+    It is also called from pymongo's monitoring threads, hence the lock.
+    """
+
+    def __init__(self, name, help, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # One slot per bucket plus +Inf, then sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in snapshot:
+            base = metric_labels(self.labels, labels)
+            cumulative = 0
+            for bound, n in zip([*self.buckets, "+Inf"], series):
+                cumulative += n
+                yield f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{base}}} {series[-1]}"
+            yield f"{self.name}_count{{{base}}} {cumulative}"
+
+
+request_latency = Histogram("taste_fit_http_request_duration_seconds", "HTTP request latency by route and status",
+                            ("method", "route", "status"))
+mongo_latency = Histogram("taste_fit_mongo_command_duration_seconds", "Mongo command latency by collection",
+                          ("collection", "command", "outcome"))
+rate_limit_rejections = Counter("taste_fit_rate_limit_rejections_total", "Requests refused by the rate limiter",
+                                ("key",))
+
+
+class MetricsMiddleware:
+    """Times every HTTP request under its route template, not the raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            request_latency.observe(
+                (scope["method"], route.path if route else "unmatched", str(status)),
+                time.perf_counter() - start
+            )
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        target = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+        self._pending[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+    def _finish(self, event, outcome):
+        collection = self._pending.pop((event.connection_id, event.request_id), "")
+        mongo_latency.observe((collection, event.command_name, outcome), event.duration_micros / 1e6)
+        for sink in request_profile_mongo_sinks:
+            if len(sink) < REQUEST_PROFILE_MAX_MONGO_COMMANDS:
+                sink.append({"collection": collection, "command": event.command_name, "outcome": outcome,
+                             "ms": round(event.duration_micros / 1000, 3)})
+
+
+mongo_command_metrics = MongoCommandMetrics()
+app.add_middleware(MetricsMiddleware)
+
+
+# --- Slow Query Log ---
+
+# Where each command keeps its filter, and the fields that make up its shape
+QUERY_SHAPE_FIELDS = {
+    "find": ("filter", "sort", "projection"),
+    "aggregate": ("pipeline",),
+    "count": ("query",),
+    "distinct": ("key", "query"),
+    "findAndModify": ("query", "sort"),
+    "delete": ("deletes",),
+    "update": ("updates",),
+}
+# Driver bookkeeping that has no place in an explain
+COMMAND_ENVELOPE_FIELDS = {"lsid", "$clusterTime", "$db", "txnNumber", "$readPreference", "readConcern",
+                           "writeConcern", "ordered", "cursor", "batchSize", "singleBatch", "let"}
+
+
+def query_shape(value):
+    """Replace literal values with "?", keeping operators, field names and $field references."""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in value.items()}
+    if isinstance(value, list):
+        if any(isinstance(v, (dict, list)) for v in value):
+            return [query_shape(v) for v in value]
+        return ["?"] if value else []
+    if isinstance(value, str) and value.startswith("$"):
+        return value
+    return "?"
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Aggregates query commands slower than SLOW_QUERY_MS by (collection, command, shape).
+
+    Keeps the most recent full command per shape, minus the driver envelope,
+    so the index report can explain it. Bounded at SLOW_QUERY_MAX_SHAPES,
+    evicting the least recently seen shape.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._shapes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name in QUERY_SHAPE_FIELDS:
+            self._pending[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        command = self._pending.pop((event.connection_id, event.request_id), None)
+        ms = event.duration_micros / 1000
+        if command is None or ms < SLOW_QUERY_MS:
+            return
+        name = event.command_name
+        shape = {field: query_shape(command[field]) for field in QUERY_SHAPE_FIELDS[name] if field in command}
+        key = (command[name], name, json.dumps(shape, sort_keys=True, default=str))
+        with self._lock:
+            entry = self._shapes.pop(key, None) or {
+                "collection": command[name], "command": name, "shape": shape, "count": 0, "total_ms": 0.0, "max_ms": 0.0
+            }
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["last_seen"] = datetime.now(timezone.utc)
+            entry["sample"] = {k: v for k, v in command.items() if k not in COMMAND_ENVELOPE_FIELDS}
+            self._shapes[key] = entry
+            while len(self._shapes) > SLOW_QUERY_MAX_SHAPES:
+                self._shapes.popitem(last=False)
+
+    def top(self, n=None):
+        with self._lock:
+            entries = list(self._shapes.values())
+        return sorted(entries, key=lambda e: e["total_ms"], reverse=True)[:n]
+
+    def clear(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+# --- Request Profiling ---
+
+REQUEST_PROFILE_TOP_FUNCTIONS = 60
+REQUEST_PROFILE_MAX_MONGO_COMMANDS = 1000
+
+recent_request_profiles = deque(maxlen=REQUEST_PROFILE_BUFFER_SIZE)
+# Mongo command logs of the profile in progress; empty, and so free, when nothing is profiled
+request_profile_mongo_sinks = []
+
+
+class ProfilingMiddleware:
+    """Runs selected requests under cProfile and keeps the result in recent_request_profiles.
+
+    cProfile sees everything on the event loop thread, so a request's profile
+    also holds any other requests that ran alongside it; only one profile runs
+    at a time. Mongo commands execute on Motor's threads and show up as the
+    list of commands that finished while the request ran, not as functions.
+    Only installed when PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.busy = False
+
+    async def trigger(self, scope):
+        if REQUEST_PROFILE_SAMPLE_RATE and random.random() < REQUEST_PROFILE_SAMPLE_RATE:
+            return "sampled"
+        request = Request(scope)
+        if request.headers.get("x-request-profile") != "1" and request.query_params.get("request_profile") != "1":
+            return None
+        try:
+            user = await verify_admin_token(request)
+        except HTTPException:
+            return None
+        return "requested" if user["role"] == "admin" else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.busy:
+            return await self.app(scope, receive, send)
+        trigger = await self.trigger(scope)
+        # The token check awaits, so another request may have started profiling meanwhile
+        if trigger is None or self.busy:
+            return await self.app(scope, receive, send)
+        self.busy = True
+
+        record = {
+            "request_profile_id": str(uuid.uuid4()),
+            "trigger": trigger,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope["query_string"].decode("latin-1"),
+            "started_at": datetime.now(timezone.utc),
+            "status": 500,
+            "mongo_commands": [],
+        }
+
+        async def send_with_request_profile_id(message):
+            if message["type"] == "http.response.start":
+                record["status"] = message["status"]
+                message["headers"] = [*message.get("headers", []),
+                                      (b"x-request-profile-id", record["request_profile_id"].encode())]
+            await send(message)
+
+        request_profile_mongo_sinks.append(record["mongo_commands"])
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_request_profile_id)
+        finally:
+            profiler.disable()
+            record["wall_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            request_profile_mongo_sinks.remove(record["mongo_commands"])
+            self.busy = False
+            output = io.StringIO()
+            stats = pstats.Stats(profiler, stream=output)
+            stats.sort_stats("cumulative").print_stats(REQUEST_PROFILE_TOP_FUNCTIONS)
+            record["loop_ms"] = round(stats.total_tt * 1000, 2)
+            record["stats"] = output.getvalue()
+            record["pstats"] = marshal.dumps(stats.stats)
+            recent_request_profiles.append(record)
+
+
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+
 # --- Pydantic Models ---
 
 class ProfileBody(BaseModel):
@@ -148,14 +571,30 @@ class EventBody(BaseModel):
     metadata: Optional[dict] = None
 
 
+class EventBatchBody(BaseModel):
+    events: List[dict] = Field(min_length=1, max_length=100)
+
+
 class LoginBody(BaseModel):
     email: str
     password: str
 
 
+class RoleBody(BaseModel):
+    role: str
+
+    @field_validator("role")
+    @classmethod
+    def validate_role(cls, v):
+        if v not in ("admin", "viewer"):
+            raise ValueError("role must be admin or viewer")
+        return v
+
+
 class TasteFitScoreBody(BaseModel):
     session_id: str
-    product_sensory: dict
+    product_id: Optional[str] = None
+    product_sensory: Optional[dict] = None
 
 
 class TasteFitBatchBody(BaseModel):
@@ -163,35 +602,216 @@ class TasteFitBatchBody(BaseModel):
     products: List[dict]
 
 
+class SensoryBody(BaseModel):
+    aroma: Optional[int] = Field(None, ge=1, le=9)
+    flavor: Optional[int] = Field(None, ge=1, le=9)
+    aftertaste: Optional[int] = Field(None, ge=1, le=9)
+    acidity: Optional[int] = Field(None, ge=1, le=9)
+    sweetness: Optional[int] = Field(None, ge=1, le=9)
+    mouthfeel: Optional[int] = Field(None, ge=1, le=9)
+
+
+class CatalogProductBody(BaseModel):
+    title: Optional[str] = None
+    sensory: SensoryBody
+    active: bool = True
+
+
 # --- Helpers ---
 
-def check_rate_limit(key: str, max_per_day: int = 10) -> bool:
-    now = datetime.now(timezone.utc)
-    if key not in rate_limits:
-        rate_limits[key] = {"count": 1, "reset": now}
+class TTLCache:
+    """Bounded LRU cache whose entries also expire ttl seconds after being set."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is not None:
+            value, expires = item
+            if expires > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def add(self, key, value):
+        """Set only if absent, so a slow read can't clobber a newer write-through."""
+        if key not in self._data:
+            self.set(key, value)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        for key in [k for k, (v, _) in self._data.items() if predicate(v)]:
+            del self._data[key]
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+profile_cache = TTLCache(PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL_SECONDS)
+
+
+async def load_profile(session_id):
+    """Taste profile for a session, served from profile_cache when fresh."""
+    profile = profile_cache.get(session_id)
+    if profile is None:
+        profile = await db.consumer_taste_profiles.find_one(
+            {"session_id": session_id}, {"_id": 0}
+        )
+        if profile:
+            profile_cache.add(session_id, profile)
+    return profile
+
+
+def sliding_window_count(previous, current, window_start, window, now):
+    """Requests seen over the last `window` seconds, assuming the previous window's were spread evenly."""
+    overlap = 1 - (now - window_start) / window
+    return previous * overlap + current
+
+
+class MemoryRateLimitBackend:
+    """Sliding-window counters kept in a bounded LRU, local to this process.
+
+    Each key holds its current window start plus the current and previous
+    window counts; the previous count is weighted by how much of it still
+    overlaps the last `window` seconds, so a budget can't be spent twice
+    across a window boundary. Past max_keys the least recently seen key is
+    evicted, which at worst resets that key's budget.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._windows = OrderedDict()
+
+    def __len__(self):
+        return len(self._windows)
+
+    async def hit(self, key, limit, window, cost=1):
+        now = time.time()
+        window_start = int(now // window) * window
+        entry = self._windows.get(key)
+        if entry is None or entry[0] < window_start - window:
+            entry = [window_start, 0, 0]
+        elif entry[0] < window_start:
+            entry = [window_start, 0, entry[1]]
+        if sliding_window_count(entry[2], entry[1], window_start, window, now) + cost > limit:
+            return False
+        entry[1] += cost
+        self._windows[key] = entry
+        self._windows.move_to_end(key)
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
         return True
-    entry = rate_limits[key]
-    if (now - entry["reset"]).total_seconds() > 86400:
-        rate_limits[key] = {"count": 1, "reset": now}
+
+
+class MongoRateLimitBackend:
+    """Sliding-window counters shared by every worker and host.
+
+    One document per (key, window) is bumped with an atomic $inc and read
+    together with the previous window's document, which is weighted as in the
+    memory backend. A TTL index on expires_at removes each document once it
+    can no longer be a previous window, so storage stays constant per active key.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def hit(self, key, limit, window, cost=1):
+        now = time.time()
+        window_start = int(now // window) * window
+        doc_id = f"{key}:{window_start}"
+        doc, previous = await asyncio.gather(
+            self.collection.find_one_and_update(
+                {"_id": doc_id},
+                {"$inc": {"count": cost},
+                 "$setOnInsert": {"expires_at": datetime.fromtimestamp(window_start + 2 * window, timezone.utc)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            ),
+            self.collection.find_one({"_id": f"{key}:{window_start - window}"}, {"count": 1})
+        )
+        previous_count = previous["count"] if previous else 0
+        if sliding_window_count(previous_count, doc["count"], window_start, window, now) > limit:
+            # Rejected requests shouldn't use up budget, so hand the charge back
+            await self.collection.update_one({"_id": doc_id}, {"$inc": {"count": -cost}})
+            return False
         return True
-    if entry["count"] >= max_per_day:
-        return False
-    entry["count"] += 1
-    return True
 
 
-async def verify_admin_token(request: Request):
+rate_limiter = MemoryRateLimitBackend(RATE_LIMIT_MAX_KEYS)
+
+
+async def check_rate_limit(key: str, max_per_day: int = 10, cost: int = 1) -> bool:
+    allowed = await rate_limiter.hit(key, max_per_day, RATE_LIMIT_WINDOW_SECONDS, cost)
+    if not allowed:
+        rate_limit_rejections.inc((key.split(":", 1)[0],))
+    return allowed
+
+
+admin_user_cache = TTLCache(1000, ADMIN_CACHE_TTL_SECONDS)
+
+
+def invalidate_admin_user(user_id):
+    """Drop cached identities for a user after their account or role changes."""
+    admin_user_cache.invalidate_where(lambda u: u["user_id"] == user_id)
+
+
+def decode_admin_token(request: Request):
     auth = request.headers.get("Authorization", "")
     if not auth.startswith("Bearer "):
         raise HTTPException(401, "Missing auth token")
     try:
-        payload = jwt.decode(auth[7:], JWT_SECRET, algorithms=["HS256"])
+        return auth[7:], jwt.decode(auth[7:], JWT_SECRET, algorithms=["HS256"])
+    except JWTError:
+        raise HTTPException(401, "Invalid token")
+
+
+async def verify_admin_token(request: Request):
+    token, payload = decode_admin_token(request)
+    key = (payload["user_id"], token)
+    user = admin_user_cache.get(key)
+    if user is None:
         user = await db.admin_users.find_one({"user_id": payload["user_id"]}, {"_id": 0})
         if not user:
             raise HTTPException(401, "User not found")
-        return user
-    except JWTError:
-        raise HTTPException(401, "Invalid token")
+        admin_user_cache.add(key, user)
+    return user
+
+
+async def verify_viewer_token(request: Request):
+    """Auth for read-only endpoints; skips the user lookup when ADMIN_TRUST_TOKEN_CLAIMS is on."""
+    if not ADMIN_TRUST_TOKEN_CLAIMS:
+        return await verify_admin_token(request)
+    _, payload = decode_admin_token(request)
+    return {"user_id": payload["user_id"], "email": payload["email"], "role": payload["role"]}
 
 
 async def require_admin_role(request: Request):
@@ -201,11 +821,206 @@ async def require_admin_role(request: Request):
     return user
 
 
-async def emit_event(name, session_id, product_id=None, variant_id=None, consumer_id=None, metadata=None):
-    await db.events.insert_one({
+def as_datetime(value):
+    """Timestamp field as an aware UTC datetime, whether stored as a BSON date or legacy ISO string."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    return value
+
+
+def parse_time_param(value):
+    """Parse a from/to filter value.
+
+    Accepts a full ISO timestamp, or a YYYY, YYYY-MM or YYYY-MM-DD prefix. Returns
+    (start, end): for a prefix, end is the start of the next period; for an exact
+    timestamp it is None. Naive values are taken as UTC.
+    """
+    m = re.fullmatch(r"(\d{4})(?:-(\d{2}))?(?:-(\d{2}))?", value)
+    try:
+        if m:
+            year, month, day = int(m[1]), int(m[2] or 1), int(m[3] or 1)
+            start = datetime(year, month, day, tzinfo=timezone.utc)
+            if m[3]:
+                end = start + timedelta(days=1)
+            elif m[2]:
+                end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+            else:
+                end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+            return start, end
+        return as_datetime(value.replace("Z", "+00:00")), None
+    except ValueError:
+        raise HTTPException(422, f"Invalid date filter: {value}")
+
+
+def time_query(field, bounds):
+    """Filter on a timestamp field that also matches legacy ISO strings while they remain."""
+    if not bounds:
+        return {}
+    if not LEGACY_STRING_TIMESTAMPS:
+        return {field: bounds}
+    legacy = {op: v.isoformat() for op, v in bounds.items()}
+    return {"$or": [{field: bounds}, {field: legacy}]}
+
+
+def time_range_query(field, date_from=None, date_to=None):
+    """from/to query params as a range filter; a date-only `to` includes that whole day."""
+    bounds = {}
+    if date_from:
+        bounds["$gte"] = parse_time_param(date_from)[0]
+    if date_to:
+        start, end = parse_time_param(date_to)
+        if end:
+            bounds["$lt"] = end
+        else:
+            bounds["$lte"] = start
+    return time_query(field, bounds)
+
+
+def utc_day(value):
+    return as_datetime(value).strftime("%Y-%m-%d")
+
+
+async def data_version(collection, field):
+    """Newest `field` value plus document count; moves on any insert or delete.
+
+    `field` must lead an index so the lookup is a single index probe.
+    """
+    doc = await collection.find_one({}, {field: 1}, sort=[(field, -1)])
+    count = await collection.estimated_document_count()
+    if doc is None:
+        return None, count
+    value = doc[field]
+    return as_datetime(value.generation_time if isinstance(value, ObjectId) else value), count
+
+
+async def conditional_get(request, response, *sources):
+    """Validate a GET against the data it reads, without running the query.
+
+    Each source is a (collection, field) pair for data_version. The ETag covers
+    those versions plus the path and query string. Returns a 304 Response when
+    the client's If-None-Match is still current; otherwise sets ETag and
+    Last-Modified on `response` and returns None.
+    """
+    versions = [await data_version(collection, field) for collection, field in sources]
+    key = "|".join([request.url.path, str(sorted(request.query_params.multi_items()))] +
+                   [f"{modified.isoformat() if modified else ''}:{count}" for modified, count in versions])
+    headers = {"ETag": f'"{hashlib.sha1(key.encode()).hexdigest()}"', "Cache-Control": "private, no-cache"}
+    modified = [m for m, _ in versions if m]
+    if modified:
+        headers["Last-Modified"] = format_datetime(max(modified), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if headers["ETag"] in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+class EventIngestor:
+    """Buffers events in memory and writes them to Mongo with insert_many.
+
+    A background task flushes every flush_interval seconds, or sooner once
+    batch_size events are waiting. The buffer is bounded by max_queue: when
+    Mongo falls behind, put() waits for room and gives up with a 503 after
+    enqueue_timeout seconds instead of letting memory grow.
+    """
+
+    def __init__(self, batch_size, flush_interval, max_queue, enqueue_timeout):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.enqueue_timeout = enqueue_timeout
+        self.written = 0
+        self.dropped = 0
+        self.collection = None
+        self._buffer = []
+        self._task = None
+        self._closing = False
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+    def start(self, collection):
+        self.collection = collection
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still buffered, then stop the background task."""
+        self._closing = True
+        self._wake.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    async def put(self, docs):
+        while len(self._buffer) >= self.max_queue:
+            self._not_full.clear()
+            try:
+                await asyncio.wait_for(self._not_full.wait(), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                raise HTTPException(503, "Event queue full")
+        self._buffer.extend(docs)
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def flush(self):
+        """Write everything buffered so far; callers that must see their events await this."""
+        async with self._lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                if len(self._buffer) < self.max_queue:
+                    self._not_full.set()
+                await self._write(batch)
+
+    def stats(self):
+        return {"buffered": len(self._buffer), "written": self.written, "dropped": self.dropped}
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+        await self.flush()
+
+    async def _write(self, batch, attempts=3):
+        for attempt in range(attempts):
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                self.written += len(batch)
+                return
+            except BulkWriteError as e:
+                inserted = e.details.get("nInserted", 0)
+                self.written += inserted
+                self.dropped += len(batch) - inserted
+                logger.error("Event batch partially written: %s", e.details.get("writeErrors", [])[:3])
+                return
+            except Exception:
+                if attempt == attempts - 1:
+                    self.dropped += len(batch)
+                    logger.exception("Dropping %d events after %d attempts", len(batch), attempts)
+                    return
+                await asyncio.sleep(2 ** attempt)
+
+
+event_ingestor = EventIngestor(EVENT_BATCH_SIZE, EVENT_FLUSH_INTERVAL_SECONDS,
+                               EVENT_QUEUE_MAX, EVENT_ENQUEUE_TIMEOUT_SECONDS)
+
+
+def event_doc(name, session_id, product_id=None, variant_id=None, consumer_id=None, metadata=None):
+    return {
         "event_id": str(uuid.uuid4()),
         "event_name": name,
-        "event_time": datetime.now(timezone.utc).isoformat(),
+        "event_time": datetime.now(timezone.utc),
         "actor_type": "consumer",
         "session_id": session_id,
         "consumer_id": consumer_id,
@@ -213,7 +1028,11 @@ async def emit_event(name, session_id, product_id=None, variant_id=None, consume
         "product_id": product_id,
         "variant_id": variant_id,
         "metadata": metadata or {}
-    })
+    }
+
+
+async def emit_event(name, session_id, product_id=None, variant_id=None, consumer_id=None, metadata=None):
+    await event_ingestor.put([event_doc(name, session_id, product_id, variant_id, consumer_id, metadata)])
 
 
 # --- Health ---
@@ -228,7 +1047,7 @@ async def health():
 @app.post("/api/auth/login")
 async def login(body: LoginBody):
     user = await db.admin_users.find_one({"email": body.email}, {"_id": 0})
-    if not user or not pwd_context.verify(body.password, user["password_hash"]):
+    if not user or not await verify_password(body.password, user["password_hash"]):
         raise HTTPException(401, "Invalid credentials")
     token = jwt.encode({
         "user_id": user["user_id"],
@@ -239,18 +1058,23 @@ async def login(body: LoginBody):
     return {"token": token, "email": user["email"], "role": user["role"]}
 
 
+@app.patch("/api/admin/users/{user_id}/role")
+async def admin_update_role(user_id: str, body: RoleBody, user=Depends(require_admin_role)):
+    result = await db.admin_users.update_one({"user_id": user_id}, {"$set": {"role": body.role}})
+    if not result.matched_count:
+        raise HTTPException(404, "User not found")
+    invalidate_admin_user(user_id)
+    return {"status": "ok", "user_id": user_id, "role": body.role}
+
+
 # --- Public: Taste Profile ---
 
 @app.post("/api/affective/profile")
 async def upsert_profile(body: ProfileBody):
-    if not check_rate_limit(f"profile:{body.session_id}"):
+    if not await check_rate_limit(f"profile:{body.session_id}"):
         raise HTTPException(429, "Rate limit exceeded")
 
-    now = datetime.now(timezone.utc).isoformat()
-    existing = await db.consumer_taste_profiles.find_one(
-        {"session_id": body.session_id}, {"_id": 0}
-    )
-
+    now = datetime.now(timezone.utc)
     profile_data = {
         "session_id": body.session_id,
         "consumer_id": body.consumer_id,
@@ -264,43 +1088,50 @@ async def upsert_profile(body: ProfileBody):
         "consent_marketing": body.consent_marketing,
         "updated_at": now
     }
+    pref_fields = ["aroma_pref_1to9", "flavor_pref_1to9", "aftertaste_pref_1to9",
+                   "acidity_pref_1to9", "sweetness_pref_1to9", "mouthfeel_pref_1to9"]
 
-    profile_id = existing.get("profile_id") if existing else str(uuid.uuid4())
-
-    result = await db.consumer_taste_profiles.update_one(
+    # One round-trip: the pre-image is all the diffing below needs, and when
+    # there is none the upsert stored new_profile_id
+    new_profile_id = str(uuid.uuid4())
+    existing = await db.consumer_taste_profiles.find_one_and_update(
         {"session_id": body.session_id},
-        {"$set": profile_data, "$setOnInsert": {"profile_id": profile_id}},
-        upsert=True
+        {"$set": profile_data, "$setOnInsert": {"profile_id": new_profile_id}},
+        projection={"_id": 0, "profile_id": 1, "consent_analytics": 1, "consent_marketing": 1,
+                    **{f: 1 for f in pref_fields}},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
     )
+    profile_id = existing["profile_id"] if existing else new_profile_id
+    profile_cache.set(body.session_id, {**profile_data, "profile_id": profile_id})
 
+    events = []
     if existing:
-        pref_fields = ["aroma_pref_1to9", "flavor_pref_1to9", "aftertaste_pref_1to9",
-                       "acidity_pref_1to9", "sweetness_pref_1to9", "mouthfeel_pref_1to9"]
         fields_changed = [f for f in pref_fields if existing.get(f) != profile_data[f]]
         consent_changed = (existing.get("consent_analytics") != body.consent_analytics or
                           existing.get("consent_marketing") != body.consent_marketing)
         if fields_changed:
-            await emit_event("taste_profile_updated", body.session_id,
-                           consumer_id=body.consumer_id,
-                           metadata={"fields_changed": fields_changed})
+            events.append(event_doc("taste_profile_updated", body.session_id,
+                                    consumer_id=body.consumer_id,
+                                    metadata={"fields_changed": fields_changed}))
         if consent_changed:
-            await emit_event("consent_updated", body.session_id,
-                           consumer_id=body.consumer_id,
-                           metadata={"consent_analytics": body.consent_analytics,
-                                    "consent_marketing": body.consent_marketing})
+            events.append(event_doc("consent_updated", body.session_id,
+                                    consumer_id=body.consumer_id,
+                                    metadata={"consent_analytics": body.consent_analytics,
+                                              "consent_marketing": body.consent_marketing}))
     else:
-        await emit_event("taste_profile_updated", body.session_id,
-                       consumer_id=body.consumer_id,
-                       metadata={"fields_changed": ["all"], "is_new": True})
+        events.append(event_doc("taste_profile_updated", body.session_id,
+                                consumer_id=body.consumer_id,
+                                metadata={"fields_changed": ["all"], "is_new": True}))
+    if events:
+        await event_ingestor.put(events)
 
     return {"status": "ok", "profile_id": profile_id}
 
 
 @app.get("/api/affective/profile")
 async def get_profile(session_id: str = Query(...)):
-    profile = await db.consumer_taste_profiles.find_one(
-        {"session_id": session_id}, {"_id": 0}
-    )
+    profile = await load_profile(session_id)
     if not profile:
         return {"profile": None}
     return {"profile": profile}
@@ -310,7 +1141,7 @@ async def get_profile(session_id: str = Query(...)):
 
 @app.post("/api/affective/response")
 async def create_response(body: ResponseBody):
-    if not check_rate_limit(f"response:{body.session_id}"):
+    if not await check_rate_limit(f"response:{body.session_id}"):
         raise HTTPException(429, "Rate limit exceeded")
 
     if body.mode == "tasted":
@@ -320,7 +1151,7 @@ async def create_response(body: ResponseBody):
             if getattr(body, field) is None:
                 raise HTTPException(422, f"Field {field} required in tasted mode")
 
-    now = datetime.now(timezone.utc).isoformat()
+    now = datetime.now(timezone.utc)
     response_data = {
         "response_id": str(uuid.uuid4()),
         "session_id": body.session_id,
@@ -345,6 +1176,7 @@ async def create_response(body: ResponseBody):
     }
 
     await db.product_affective_responses.insert_one(response_data)
+    await record_rollup(response_data)
 
     await emit_event("affective_form_submitted", body.session_id,
                     product_id=body.product_id,
@@ -364,7 +1196,7 @@ async def create_response(body: ResponseBody):
 
 @app.post("/api/events")
 async def create_event(body: EventBody):
-    if not check_rate_limit(f"event:{body.session_id}", max_per_day=50):
+    if not await check_rate_limit(f"event:{body.session_id}", max_per_day=50):
         raise HTTPException(429, "Rate limit exceeded")
     await emit_event(body.event_name, body.session_id,
                     product_id=body.product_id,
@@ -373,6 +1205,37 @@ async def create_event(body: EventBody):
     return {"status": "ok"}
 
 
+@app.post("/api/events/batch")
+async def create_events_batch(body: EventBatchBody):
+    results = [None] * len(body.events)
+    by_session = defaultdict(list)
+    for i, raw in enumerate(body.events):
+        try:
+            event = EventBody.model_validate(raw)
+        except ValidationError as e:
+            results[i] = {"index": i, "status": "invalid",
+                          "detail": e.errors(include_url=False, include_context=False)}
+            continue
+        by_session[event.session_id].append((i, event))
+
+    docs = []
+    for session_id, items in by_session.items():
+        # The whole group is charged against the session budget at once
+        allowed = await check_rate_limit(f"event:{session_id}", max_per_day=50, cost=len(items))
+        for i, event in items:
+            if not allowed:
+                results[i] = {"index": i, "status": "rate_limited"}
+                continue
+            docs.append(event_doc(event.event_name, event.session_id,
+                                  product_id=event.product_id,
+                                  variant_id=event.variant_id,
+                                  metadata=event.metadata))
+            results[i] = {"index": i, "status": "accepted", "event_id": docs[-1]["event_id"]}
+    if docs:
+        await event_ingestor.put(docs)
+    return {"status": "ok", "accepted": len(docs), "results": results}
+
+
 # --- Public: Taste-Fit Score ---
 
 def compute_fit_score(profile, product_sensory):
@@ -413,197 +1276,782 @@ def compute_fit_score(profile, product_sensory):
     }
 
 
+SENSORY_ATTRS = ["aroma", "flavor", "aftertaste", "acidity", "sweetness", "mouthfeel"]
+FIT_LABELS = ["Different Vibe", "Decent Fit", "Good Fit", "Great Match", "Perfect Match"]
+FIT_LABEL_THRESHOLDS = np.array([45, 60, 75, 90])
+# Below this many products, array setup costs more than the scalar loop
+VECTORIZE_MIN_PRODUCTS = 32
+
+
+def profile_vector(profile):
+    """Profile preferences as a length-6 float vector, NaN where unset."""
+    return np.array([
+        np.nan if profile.get(f"{attr}_pref_1to9") is None else profile[f"{attr}_pref_1to9"]
+        for attr in SENSORY_ATTRS
+    ], dtype=float)
+
+
+def sensory_matrix(products_sensory):
+    """Stack product sensory dicts into an (n, 6) float matrix, NaN where missing."""
+    matrix = np.full((len(products_sensory), len(SENSORY_ATTRS)), np.nan)
+    for j, attr in enumerate(SENSORY_ATTRS):
+        column = [s.get(attr) for s in products_sensory]
+        matrix[:, j] = [np.nan if v is None else v for v in column]
+    return matrix
+
+
+def score_fit_matrix(pref, matrix):
+    """Vectorized compute_fit_score over an (n, 6) sensory matrix.
+
+    Returns arrays of curved score, raw score, label index, per-attribute match
+    percentage and the mask of attributes that were scored.
+    """
+    valid = ~np.isnan(matrix) & ~np.isnan(pref)
+    match = np.maximum(0, 1 - np.abs(pref - matrix) / 8)
+    # Accumulate column by column so float sums match the scalar loop bit for bit
+    total = np.zeros(len(matrix))
+    for j in range(matrix.shape[1]):
+        total += np.where(valid[:, j], match[:, j], 0.0)
+    count = valid.sum(axis=1)
+    raw = np.round(total / np.maximum(count, 1) * 100)
+    curved = np.round(np.clip(raw * 1.1 - 5, 0, 99))
+    return {
+        "score": curved.astype(int),
+        "raw_score": raw.astype(int),
+        "label": np.searchsorted(FIT_LABEL_THRESHOLDS, curved, side="right"),
+        "match": np.where(valid, np.round(np.nan_to_num(match) * 100), 0).astype(int),
+        "valid": valid,
+    }
+
+
+def compute_fit_scores(profile, products_sensory):
+    """Batch version of compute_fit_score: one array pass, same output per product.
+
+    Breakdown entries depend only on (attribute, product value) for a given
+    profile, so identical entries are shared between products rather than rebuilt.
+    """
+    if len(products_sensory) < VECTORIZE_MIN_PRODUCTS:
+        return [compute_fit_score(profile, sensory) for sensory in products_sensory]
+    fit = score_fit_matrix(profile_vector(profile), sensory_matrix(products_sensory))
+    prefs = [profile.get(f"{attr}_pref_1to9") for attr in SENSORY_ATTRS]
+    matches = fit["match"].T.tolist()
+    entries = [{} for _ in SENSORY_ATTRS]
+    results = []
+    for i, (sensory, score, raw, label, valid) in enumerate(zip(
+        products_sensory, fit["score"].tolist(), fit["raw_score"].tolist(),
+        fit["label"].tolist(), fit["valid"].tolist()
+    )):
+        breakdown = {}
+        for j, attr in enumerate(SENSORY_ATTRS):
+            if valid[j]:
+                value = sensory[attr]
+                entry = entries[j].get(value)
+                if entry is None:
+                    entry = entries[j][value] = {
+                        "match": matches[j][i],
+                        "pref": prefs[j],
+                        "product": value,
+                        "delta": value - prefs[j],
+                    }
+                breakdown[attr] = entry
+        results.append({
+            "score": score,
+            "raw_score": raw,
+            "label": FIT_LABELS[label],
+            "breakdown": breakdown,
+        })
+    return results
+
+
 @app.post("/api/affective/taste-fit")
 async def taste_fit_score(body: TasteFitScoreBody):
-    profile = await db.consumer_taste_profiles.find_one(
-        {"session_id": body.session_id}, {"_id": 0}
-    )
+    if body.product_sensory is None and not body.product_id:
+        raise HTTPException(422, "Provide product_id or product_sensory")
+    profile = await load_profile(body.session_id)
     if not profile:
         return {"profile_exists": False, "score": None}
-    result = compute_fit_score(profile, body.product_sensory)
+    sensory = body.product_sensory
+    if sensory is None:
+        product = catalog_index.products.get(body.product_id)
+        if not product:
+            raise HTTPException(404, "Product not in catalog")
+        sensory = product["sensory"]
+    result = compute_fit_score(profile, sensory)
     return {**result, "profile_exists": True}
 
 
 @app.post("/api/affective/taste-fit/batch")
 async def taste_fit_batch(body: TasteFitBatchBody):
-    profile = await db.consumer_taste_profiles.find_one(
-        {"session_id": body.session_id}, {"_id": 0}
-    )
+    profile = await load_profile(body.session_id)
     if not profile:
         return {"profile_exists": False, "scores": []}
-    scores = []
-    for product in body.products:
-        pid = product.get("product_id", "")
-        sensory = product.get("sensory", {})
-        result = compute_fit_score(profile, sensory)
-        scores.append({"product_id": pid, **result})
+    results = compute_fit_scores(profile, [catalog_index.sensory_for(p) for p in body.products])
+    scores = [
+        {"product_id": product.get("product_id", ""), **result}
+        for product, result in zip(body.products, results)
+    ]
     return {"profile_exists": True, "scores": scores}
 
 
+# --- Product Catalog ---
+
+class CatalogIndex:
+    """In-memory sensory index over the products catalog.
+
+    Catalog sensory values sit on the discrete 1-9 grid, so a profile becomes a
+    (6, 10) match lookup table and every product is scored with six gathers.
+    Column 0 of the grid stands for "not rated" and never counts.
+    """
+
+    def __init__(self):
+        self.products = {}
+        self.watermark = None
+        self._ids = []
+        self._codes = np.zeros((0, len(SENSORY_ATTRS)), dtype=np.int8)
+        self._dirty = False
+
+    def apply(self, docs):
+        """Upsert or drop catalog docs; returns how many actually changed the index."""
+        changed = 0
+        for doc in docs:
+            product_id = doc["product_id"]
+            if doc.get("active", True):
+                if self.products.get(product_id) != doc:
+                    self.products[product_id] = doc
+                    changed += 1
+            elif self.products.pop(product_id, None) is not None:
+                changed += 1
+        if changed:
+            self._dirty = True
+        return changed
+
+    async def refresh(self, db):
+        """Pull catalog changes since the last watermark (everything on first call).
+
+        updated_at comes from app hosts' clocks, so a write can commit after a
+        later-stamped one was already seen; every refresh re-reads the last
+        CATALOG_REFRESH_LOOKBACK_SECONDS behind the watermark to pick it up.
+        """
+        query = {}
+        if self.watermark:
+            since = self.watermark - timedelta(seconds=CATALOG_REFRESH_LOOKBACK_SECONDS)
+            query = {"updated_at": {"$gte": since}}
+        docs = await db.products.find(query, {"_id": 0}).sort("updated_at", 1).to_list(None)
+        if docs and (self.watermark is None or docs[-1]["updated_at"] > self.watermark):
+            self.watermark = docs[-1]["updated_at"]
+        return self.apply(docs)
+
+    def sensory_for(self, product):
+        """Sensory dict for a batch item, falling back to the catalog when omitted."""
+        if product.get("sensory") is not None:
+            return product["sensory"]
+        doc = self.products.get(product.get("product_id"))
+        return doc["sensory"] if doc else {}
+
+    def _arrays(self):
+        if self._dirty:
+            self._ids = list(self.products)
+            self._codes = np.array(
+                [[self.products[pid]["sensory"].get(attr) or 0 for attr in SENSORY_ATTRS]
+                 for pid in self._ids],
+                dtype=np.int8,
+            ).reshape(len(self._ids), len(SENSORY_ATTRS))
+            self._dirty = False
+        return self._ids, self._codes
+
+    def top_k(self, profile, k):
+        """Product ids of the k best raw fit scores, best first."""
+        ids, codes = self._arrays()
+        if not ids:
+            return []
+        pref = profile_vector(profile)
+        grid = np.arange(10)
+        known = ~np.isnan(pref)[:, None] & (grid > 0)
+        table = np.where(known, np.maximum(0, 1 - np.abs(pref[:, None] - grid) / 8), 0.0)
+        total = np.zeros(len(ids))
+        count = np.zeros(len(ids), dtype=int)
+        for j in range(len(SENSORY_ATTRS)):
+            total += table[j, codes[:, j]]
+            count += known[j, codes[:, j]]
+        raw = np.round(total / np.maximum(count, 1) * 100)
+        k = min(k, len(ids))
+        top = np.argpartition(-raw, k - 1)[:k]
+        top = top[np.lexsort((top, -raw[top]))]
+        return [ids[i] for i in top]
+
+
+catalog_index = CatalogIndex()
+
+
+async def refresh_catalog_periodically():
+    while True:
+        await asyncio.sleep(CATALOG_REFRESH_SECONDS)
+        try:
+            await catalog_index.refresh(db)
+        except Exception:
+            logger.exception("Catalog refresh failed")
+
+
+@app.get("/api/affective/taste-fit/top")
+async def taste_fit_top(
+    session_id: str = Query(...),
+    k: int = Query(10, ge=1, le=100)
+):
+    profile = await load_profile(session_id)
+    if not profile:
+        return {"profile_exists": False, "products": []}
+    top_ids = catalog_index.top_k(profile, k)
+    docs = [catalog_index.products[pid] for pid in top_ids]
+    results = compute_fit_scores(profile, [d["sensory"] for d in docs])
+    products = [
+        {"product_id": d["product_id"], "title": d.get("title"), **result}
+        for d, result in zip(docs, results)
+    ]
+    return {"profile_exists": True, "products": products}
+
+
+@app.get("/api/admin/catalog")
+async def admin_list_catalog(request: Request, user=Depends(verify_viewer_token)):
+    products = await db.products.find({"active": True}, {"_id": 0}).sort("product_id", 1).to_list(None)
+    return {"products": products}
+
+
+@app.put("/api/admin/catalog/{product_id}")
+async def admin_upsert_catalog_product(
+    product_id: str,
+    body: CatalogProductBody,
+    user=Depends(require_admin_role)
+):
+    doc = {
+        "product_id": product_id,
+        "title": body.title,
+        "sensory": body.sensory.model_dump(exclude_none=True),
+        "active": body.active,
+        "updated_at": datetime.now(timezone.utc)
+    }
+    await db.products.update_one({"product_id": product_id}, {"$set": doc}, upsert=True)
+    catalog_index.apply([doc])
+    return {"status": "ok", "product": doc}
+
+
+@app.delete("/api/admin/catalog/{product_id}")
+async def admin_delete_catalog_product(product_id: str, user=Depends(require_admin_role)):
+    doc = {"product_id": product_id, "active": False,
+           "updated_at": datetime.now(timezone.utc)}
+    result = await db.products.update_one({"product_id": product_id}, {"$set": doc})
+    if not result.matched_count:
+        raise HTTPException(404, "Product not in catalog")
+    catalog_index.apply([doc])
+    return {"status": "ok"}
+
+
+# --- Rollups ---
+
+def rollup_key(tag):
+    """Tag name as a safe Mongo field name (no dots, no leading $, never empty)."""
+    return "t_" + tag.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def rollup_tag(key):
+    return unquote(key[2:])
+
+
+def rollup_increments(response):
+    """$inc document adding one response to its (product_id, day, mode) rollup."""
+    inc = defaultdict(int)
+    inc["count"] = 1
+    for attr in RESPONSE_ATTRS:
+        v = response.get(attr)
+        if v is not None:
+            inc[f"sums.{attr}"] += v
+            inc[f"counts.{attr}"] += 1
+            inc[f"hist.{attr}.{v}"] += 1
+    for field in ("standout_tags", "fit_tags"):
+        for tag in response.get(field) or []:
+            inc[f"{field}.{rollup_key(tag)}"] += 1
+    if response.get("notes"):
+        inc["notes_count"] = 1
+    return dict(inc)
+
+
+def rollup_filter(response):
+    return {"product_id": response["product_id"], "day": utc_day(response["created_at"]), "mode": response["mode"]}
+
+
+async def record_rollup(response):
+    """Fold one response into its daily rollup and product totals, both writes in flight at once."""
+    created_at = as_datetime(response["created_at"])
+    daily = db.product_daily_stats.update_one(
+        rollup_filter(response),
+        {"$inc": rollup_increments(response), "$max": {"last_response": created_at}},
+        upsert=True
+    )
+    totals = db.product_response_stats.update_one(
+        {"product_id": response["product_id"]},
+        {"$inc": {"response_count": 1},
+         "$max": {"last_response": created_at},
+         "$addToSet": {"modes": response["mode"]},
+         "$setOnInsert": {"product_id_lower": response["product_id"].lower()}},
+        upsert=True
+    )
+    await asyncio.gather(daily, totals)
+
+
+def day_aligned(*dates):
+    """True when every given date filter is a whole-day prefix the rollups can answer."""
+    return all(d is None or re.fullmatch(r"\d{4}(-\d{2}){0,2}", d) for d in dates)
+
+
+def rollup_day_query(date_from, date_to):
+    day_q = {}
+    if date_from:
+        day_q["$gte"] = parse_time_param(date_from)[0].strftime("%Y-%m-%d")
+    if date_to:
+        day_q["$lt"] = parse_time_param(date_to)[1].strftime("%Y-%m-%d")
+    return {"day": day_q} if day_q else {}
+
+
+async def summarize_rollups(query):
+    """Same output as summarize_responses, merged from O(days) rollup documents."""
+    count = 0
+    notes_count = 0
+    sums = defaultdict(int)
+    counts = defaultdict(int)
+    hist = defaultdict(lambda: defaultdict(int))
+    tag_counts = {"standout_tags": defaultdict(int), "fit_tags": defaultdict(int)}
+    mode_counts = defaultdict(int)
+    async for doc in db.product_daily_stats.find(query, {"_id": 0}):
+        count += doc.get("count", 0)
+        notes_count += doc.get("notes_count", 0)
+        mode_counts[doc["mode"]] += doc.get("count", 0)
+        for attr, v in doc.get("sums", {}).items():
+            sums[attr] += v
+        for attr, v in doc.get("counts", {}).items():
+            counts[attr] += v
+        for attr, values in doc.get("hist", {}).items():
+            for value, n in values.items():
+                hist[attr][value] += n
+        for field, tags in tag_counts.items():
+            for key, n in doc.get(field, {}).items():
+                tags[rollup_tag(key)] += n
+    if not count:
+        return {"count": 0, "averages": {}, "distributions": {}, "standout_tags": {}, "fit_tags": {}, "notes_count": 0, "mode_breakdown": {}}
+
+    averages = {}
+    distributions = {}
+    for attr in RESPONSE_ATTRS:
+        if counts.get(attr):
+            averages[attr] = round(sums[attr] / counts[attr], 2)
+            distributions[attr] = {str(i): hist[attr].get(str(i), 0) for i in range(1, 10)}
+
+    return {
+        "count": count,
+        "averages": averages,
+        "distributions": distributions,
+        "standout_tags": {t: n for t, n in tag_counts["standout_tags"].items() if n},
+        "fit_tags": {t: n for t, n in tag_counts["fit_tags"].items() if n},
+        "notes_count": notes_count,
+        "mode_breakdown": dict(mode_counts)
+    }
+
+
 # --- Admin: List Products ---
 
+PRODUCT_SORTS = ("last_response", "response_count", "product_id")
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(token, parsers):
+    """Decode a cursor into one value per parser; anything malformed is a 422, never a 500."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("wrong cursor shape")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(422, "Invalid cursor")
+
+
+def cursor_time(value):
+    """Cursor form of a timestamp that keeps legacy ISO strings apart from BSON dates."""
+    return {"legacy": value} if isinstance(value, str) else {"date": as_datetime(value).isoformat()}
+
+
+def parse_cursor_time(value):
+    if isinstance(value, dict) and len(value) == 1:
+        if isinstance(value.get("legacy"), str):
+            return value["legacy"]
+        if isinstance(value.get("date"), str):
+            return as_datetime(value["date"])
+    raise ValueError("bad cursor timestamp")
+
+
+def parse_cursor_str(value):
+    if not isinstance(value, str):
+        raise ValueError("bad cursor string")
+    return value
+
+
+def parse_cursor_int(value):
+    if type(value) is not int:
+        raise ValueError("bad cursor integer")
+    return value
+
+
+def time_keyset_clauses(field, value, desc, tiebreak):
+    """$or clauses continuing a keyset past `value` on a timestamp field.
+
+    `tiebreak` is the filter that orders rows sharing `value`. Legacy string
+    timestamps sort apart from BSON dates (strings first, ascending), so while
+    they remain a cursor in one type also admits the whole of the type that
+    comes next.
+    """
+    op = "$lt" if desc else "$gt"
+    clauses = [{field: {op: value}}, {field: value, **tiebreak}]
+    if LEGACY_STRING_TIMESTAMPS and isinstance(value, str) != desc:
+        clauses.append({field: {"$type": "string" if desc else "date"}})
+    return clauses
+
+
+PRODUCT_CURSOR_PARSERS = {
+    "last_response": (parse_cursor_time, parse_cursor_str),
+    "response_count": (parse_cursor_int, parse_cursor_str),
+    "product_id": (parse_cursor_str, parse_cursor_str),
+}
+
+
+def product_page_stages(search, sort, order, after, limit):
+    """Search, keyset and sort stages over documents shaped like product_response_stats."""
+    direction = -1 if order == "desc" else 1
+    op = "$lt" if direction == -1 else "$gt"
+    match = {}
+    if search:
+        match["product_id_lower"] = {"$regex": re.escape(search.lower())}
+    if after:
+        value, pid = decode_cursor(after, PRODUCT_CURSOR_PARSERS[sort])
+        if sort == "product_id":
+            match["product_id"] = {op: pid}
+        elif sort == "last_response":
+            match["$or"] = time_keyset_clauses(sort, value, direction == -1, {"product_id": {"$gt": pid}})
+        else:
+            match["$or"] = [{sort: {op: value}}, {sort: value, "product_id": {"$gt": pid}}]
+    stages = [{"$match": match}] if match else []
+    sort_spec = {sort: direction} if sort == "product_id" else {sort: direction, "product_id": 1}
+    return stages + [{"$sort": sort_spec}, {"$limit": limit + 1}]
+
+
 @app.get("/api/admin/products")
 async def admin_list_products(
     request: Request,
+    response: Response,
     search: Optional[str] = None,
-    user=Depends(verify_admin_token)
+    sort: str = "last_response",
+    order: str = "desc",
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = None,
+    user=Depends(verify_viewer_token)
 ):
-    pipeline = [
-        {"$group": {
-            "_id": "$product_id",
-            "count": {"$sum": 1},
-            "last_response": {"$max": "$created_at"},
-            "modes": {"$addToSet": "$mode"}
-        }},
-        {"$sort": {"last_response": -1}}
-    ]
-    products = await db.product_affective_responses.aggregate(pipeline).to_list(1000)
-    result = []
-    for p in products:
-        pid = p["_id"] or ""
-        if search and search.lower() not in pid.lower():
-            continue
-        result.append({
-            "product_id": pid,
-            "response_count": p["count"],
-            "last_response": p["last_response"],
-            "modes": p["modes"]
-        })
-    return {"products": result}
+    """Products with response totals, searched, sorted and keyset-paged.
+
+    Only with ROLLUP_READS does this read the indexed product_response_stats;
+    otherwise every call still groups the whole responses collection and the
+    search, sort and cursor apply to the grouped rows.
+    """
+    not_modified = await conditional_get(request, response, (db.product_affective_responses, "created_at"))
+    if not_modified:
+        return not_modified
+    if sort not in PRODUCT_SORTS or order not in ("asc", "desc"):
+        raise HTTPException(422, f"sort must be one of {', '.join(PRODUCT_SORTS)}; order asc or desc")
+    page_stages = product_page_stages(search, sort, order, after, limit)
+    if ROLLUP_READS:
+        pipeline = page_stages
+        collection = db.product_response_stats
+    else:
+        pipeline = [
+            {"$group": {
+                "_id": "$product_id",
+                "response_count": {"$sum": 1},
+                "last_response": {"$max": "$created_at"},
+                "modes": {"$addToSet": "$mode"}
+            }},
+            {"$project": {
+                "_id": 0,
+                "product_id": {"$ifNull": ["$_id", ""]},
+                "product_id_lower": {"$toLower": {"$ifNull": ["$_id", ""]}},
+                "response_count": 1,
+                "last_response": 1,
+                "modes": 1
+            }},
+        ] + page_stages
+        collection = db.product_affective_responses
+    rows = await collection.aggregate(pipeline).to_list(limit + 1)
+
+    products = [{
+        "product_id": p["product_id"],
+        "response_count": p["response_count"],
+        "last_response": p["last_response"],
+        "modes": p["modes"]
+    } for p in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = products[-1]
+        value = cursor_time(last[sort]) if sort == "last_response" else last[sort]
+        next_cursor = encode_cursor([value, last["product_id"]])
+    return {"products": products, "next": next_cursor}
 
 
 # --- Admin: Product Summary ---
 
+RESPONSE_ATTRS = ["aroma_1to9", "flavor_1to9", "aftertaste_1to9",
+                  "acidity_1to9", "sweetness_1to9", "mouthfeel_1to9", "overall_liking_1to9"]
+
+
+def summary_pipeline(query):
+    """One $facet pass producing every number the product summary needs."""
+    facets = {
+        "count": [{"$count": "n"}],
+        "notes": [{"$match": {"notes": {"$nin": [None, ""]}}}, {"$count": "n"}],
+        "modes": [{"$group": {"_id": {"$ifNull": ["$mode", "unknown"]}, "n": {"$sum": 1}}}],
+    }
+    for field in ("standout_tags", "fit_tags"):
+        facets[field] = [
+            {"$unwind": f"${field}"},
+            {"$group": {"_id": f"${field}", "n": {"$sum": 1}}},
+        ]
+    for attr in RESPONSE_ATTRS:
+        facets[attr] = [
+            {"$match": {attr: {"$ne": None}}},
+            {"$group": {"_id": f"${attr}", "n": {"$sum": 1}}},
+        ]
+    return [{"$match": query}, {"$facet": facets}]
+
+
+async def summarize_responses(query):
+    result = (await db.product_affective_responses.aggregate(summary_pipeline(query)).to_list(1))[0]
+    count = result["count"][0]["n"] if result["count"] else 0
+    if not count:
+        return {"count": 0, "averages": {}, "distributions": {}, "standout_tags": {}, "fit_tags": {}, "notes_count": 0, "mode_breakdown": {}}
+
+    averages = {}
+    distributions = {}
+    for attr in RESPONSE_ATTRS:
+        buckets = result[attr]
+        if buckets:
+            dist = {str(i): 0 for i in range(1, 10)}
+            for b in buckets:
+                dist[str(b["_id"])] = b["n"]
+            total = sum(b["n"] for b in buckets)
+            averages[attr] = round(sum(b["_id"] * b["n"] for b in buckets) / total, 2)
+            distributions[attr] = dist
+
+    return {
+        "count": count,
+        "averages": averages,
+        "distributions": distributions,
+        "standout_tags": {b["_id"]: b["n"] for b in result["standout_tags"]},
+        "fit_tags": {b["_id"]: b["n"] for b in result["fit_tags"]},
+        "notes_count": result["notes"][0]["n"] if result["notes"] else 0,
+        "mode_breakdown": {b["_id"]: b["n"] for b in result["modes"]}
+    }
+
+
 @app.get("/api/admin/products/summary")
 async def admin_product_summary(
     request: Request,
+    response: Response,
     product_id: Optional[str] = None,
     date_from: Optional[str] = Query(None, alias="from"),
     date_to: Optional[str] = Query(None, alias="to"),
-    user=Depends(verify_admin_token)
+    user=Depends(verify_viewer_token)
 ):
+    not_modified = await conditional_get(request, response, (db.product_affective_responses, "created_at"))
+    if not_modified:
+        return not_modified
     query = {}
     if product_id:
         query["product_id"] = product_id
-    if date_from or date_to:
-        date_q = {}
-        if date_from:
-            date_q["$gte"] = date_from
-        if date_to:
-            date_q["$lte"] = date_to
-        query["created_at"] = date_q
+    query.update(time_range_query("created_at", date_from, date_to))
 
-    responses = await db.product_affective_responses.find(query, {"_id": 0}).to_list(10000)
+    if ROLLUP_READS and day_aligned(date_from, date_to):
+        rollup_query = rollup_day_query(date_from, date_to)
+        if product_id:
+            rollup_query["product_id"] = product_id
+        return await summarize_rollups(rollup_query)
+    return await summarize_responses(query)
 
-    if not responses:
-        return {"count": 0, "averages": {}, "distributions": {}, "standout_tags": {}, "fit_tags": {}, "notes_count": 0, "mode_breakdown": {}}
 
-    attrs = ["aroma_1to9", "flavor_1to9", "aftertaste_1to9",
-             "acidity_1to9", "sweetness_1to9", "mouthfeel_1to9", "overall_liking_1to9"]
+# --- Admin: Segments ---
 
-    averages = {}
-    distributions = {}
-    for attr in attrs:
-        values = [r[attr] for r in responses if r.get(attr) is not None]
-        if values:
-            averages[attr] = round(sum(values) / len(values), 2)
-            dist = {str(i): 0 for i in range(1, 10)}
-            for v in values:
-                dist[str(v)] += 1
-            distributions[attr] = dist
+PREF_ATTRS = [f"{attr}_pref_1to9" for attr in SENSORY_ATTRS]
+SEGMENT_BANDS = [("low_1_3", 1, 3), ("mid_4_6", 4, 6), ("high_7_9", 7, 9)]
 
-    tag_counts = defaultdict(int)
-    fit_tag_counts = defaultdict(int)
-    for r in responses:
-        for t in (r.get("standout_tags") or []):
-            tag_counts[t] += 1
-        for t in (r.get("fit_tags") or []):
-            fit_tag_counts[t] += 1
 
-    notes_count = sum(1 for r in responses if r.get("notes"))
-    mode_counts = defaultdict(int)
-    for r in responses:
-        mode_counts[r.get("mode", "unknown")] += 1
+def band_expr(field):
+    """Aggregation expression mapping a 1-9 field to its segment band name, or null."""
+    return {"$switch": {
+        "branches": [
+            {"case": {"$and": [{"$gte": [f"${field}", lo]}, {"$lte": [f"${field}", hi]}]}, "then": name}
+            for name, lo, hi in SEGMENT_BANDS
+        ],
+        "default": None
+    }}
 
-    return {
-        "count": len(responses),
-        "averages": averages,
-        "distributions": distributions,
-        "standout_tags": dict(tag_counts),
-        "fit_tags": dict(fit_tag_counts),
-        "notes_count": notes_count,
-        "mode_breakdown": dict(mode_counts)
-    }
-
-
-# --- Admin: Segments ---
 
 @app.get("/api/admin/segments")
 async def admin_segments(
     request: Request,
+    response: Response,
     date_from: Optional[str] = Query(None, alias="from"),
     date_to: Optional[str] = Query(None, alias="to"),
-    user=Depends(verify_admin_token)
+    cross: Optional[str] = Query(None, description="Two pref fields, e.g. acidity_pref_1to9,sweetness_pref_1to9"),
+    user=Depends(verify_viewer_token)
 ):
-    query = {}
-    if date_from or date_to:
-        date_q = {}
-        if date_from:
-            date_q["$gte"] = date_from
-        if date_to:
-            date_q["$lte"] = date_to
-        query["updated_at"] = date_q
-
-    profiles = await db.consumer_taste_profiles.find(query, {"_id": 0}).to_list(10000)
-    attrs = ["aroma_pref_1to9", "flavor_pref_1to9", "aftertaste_pref_1to9",
-             "acidity_pref_1to9", "sweetness_pref_1to9", "mouthfeel_pref_1to9"]
+    not_modified = await conditional_get(request, response, (db.consumer_taste_profiles, "updated_at"))
+    if not_modified:
+        return not_modified
+    if cross:
+        cross = cross.split(",")
+        if len(cross) != 2 or not all(c in PREF_ATTRS for c in cross):
+            raise HTTPException(422, "cross must be two comma-separated pref fields")
+    query = time_range_query("updated_at", date_from, date_to)
+
+    facets = {"total": [{"$count": "n"}]}
+    for attr in PREF_ATTRS:
+        facets[attr] = [{"$group": {"_id": band_expr(attr), "n": {"$sum": 1}}}]
+    if cross:
+        facets["cross"] = [{"$group": {
+            "_id": {"x": band_expr(cross[0]), "y": band_expr(cross[1])},
+            "n": {"$sum": 1}
+        }}]
+    pipeline = [{"$match": query}, {"$facet": facets}]
+    result = (await db.consumer_taste_profiles.aggregate(pipeline).to_list(1))[0]
 
     segments = {}
-    for attr in attrs:
-        bands = {"low_1_3": 0, "mid_4_6": 0, "high_7_9": 0}
-        for p in profiles:
-            v = p.get(attr)
-            if v is not None:
-                if 1 <= v <= 3:
-                    bands["low_1_3"] += 1
-                elif 4 <= v <= 6:
-                    bands["mid_4_6"] += 1
-                elif 7 <= v <= 9:
-                    bands["high_7_9"] += 1
+    for attr in PREF_ATTRS:
+        bands = {name: 0 for name, _, _ in SEGMENT_BANDS}
+        for b in result[attr]:
+            if b["_id"]:
+                bands[b["_id"]] = b["n"]
         segments[attr] = bands
 
-    return {"total_profiles": len(profiles), "segments": segments}
+    payload = {
+        "total_profiles": result["total"][0]["n"] if result["total"] else 0,
+        "segments": segments
+    }
+    if cross:
+        matrix = {x: {y: 0 for y, _, _ in SEGMENT_BANDS} for x, _, _ in SEGMENT_BANDS}
+        for b in result["cross"]:
+            if b["_id"].get("x") and b["_id"].get("y"):
+                matrix[b["_id"]["x"]][b["_id"]["y"]] = b["n"]
+        payload["cross"] = {"x": cross[0], "y": cross[1], "counts": matrix}
+    return payload
 
 
 # --- Admin: Funnel ---
 
+FUNNEL_STEPS = ["product_viewed", "affective_form_viewed", "affective_form_opened", "affective_form_submitted"]
+
+
+def funnel_stages(keys):
+    """Collapse events to one row per session (plus keys), then count sessions per step."""
+    return [
+        {"$group": {"_id": {"session_id": "$session_id", **keys}, "steps": {"$addToSet": "$event_name"}}},
+        {"$group": {
+            "_id": {k: f"$_id.{k}" for k in keys},
+            **{step: {"$sum": {"$cond": [{"$in": [step, "$steps"]}, 1, 0]}} for step in FUNNEL_STEPS}
+        }},
+    ]
+
+
+def funnel_counts(row):
+    return {step: row.get(step, 0) for step in FUNNEL_STEPS}
+
+
+def funnel_conversion(counts):
+    """Step-over-previous-step rates, plus first-to-last as overall."""
+    def rate(num, den):
+        return round(num / den, 4) if den else 0.0
+    conversion = {
+        step: rate(counts[step], counts[prev])
+        for prev, step in zip(FUNNEL_STEPS, FUNNEL_STEPS[1:])
+    }
+    conversion["overall"] = rate(counts[FUNNEL_STEPS[-1]], counts[FUNNEL_STEPS[0]])
+    return conversion
+
+
 @app.get("/api/admin/funnel")
 async def admin_funnel(
     request: Request,
+    response: Response,
     date_from: Optional[str] = Query(None, alias="from"),
     date_to: Optional[str] = Query(None, alias="to"),
-    user=Depends(verify_admin_token)
+    by_product: bool = False,
+    daily: bool = False,
+    user=Depends(verify_viewer_token)
 ):
-    query = {}
-    if date_from or date_to:
-        date_q = {}
-        if date_from:
-            date_q["$gte"] = date_from
-        if date_to:
-            date_q["$lte"] = date_to
-        query["event_time"] = date_q
-
-    funnel_events = ["product_viewed", "affective_form_viewed", "affective_form_opened", "affective_form_submitted"]
-    counts = {}
-    for event_name in funnel_events:
-        q = {**query, "event_name": event_name}
-        count = await db.events.count_documents(q)
-        counts[event_name] = count
-    return {"funnel": counts}
+    not_modified = await conditional_get(request, response, (db.events, "_id"))
+    if not_modified:
+        return not_modified
+    query = time_range_query("event_time", date_from, date_to)
+
+    query["event_name"] = {"$in": FUNNEL_STEPS}
+    breakdown_keys = {}
+    if by_product:
+        breakdown_keys["product_id"] = "$product_id"
+    if daily:
+        # Dates and legacy ISO strings both render as YYYY-MM-DD... in UTC
+        breakdown_keys["date"] = {"$substr": [{"$toString": "$event_time"}, 0, 10]}
+
+    # The per-session $addToSet can outgrow the 100MB stage limit on wide ranges before Mongo 6.0
+    overall = await db.events.aggregate([{"$match": query}, *funnel_stages({})], allowDiskUse=True).to_list(1)
+    counts = funnel_counts(overall[0] if overall else {})
+    payload = {"funnel": counts, "conversion": funnel_conversion(counts)}
+    if breakdown_keys:
+        # Its own aggregation, one row per group: a product x day breakdown inside a $facet
+        # document would run into the 16MB limit
+        pipeline = [{"$match": query}, *funnel_stages(breakdown_keys), {"$sort": {"_id": 1}}]
+        rows = []
+        async for row in db.events.aggregate(pipeline, allowDiskUse=True):
+            counts = funnel_counts(row)
+            rows.append({**row["_id"], "funnel": counts, "conversion": funnel_conversion(counts)})
+        payload["breakdown"] = rows
+    return payload
 
 
 # --- Admin: CSV Export ---
 
+EXPORT_CHUNK_ROWS = 1000
+EXPORT_CSV_FIELDS = ["response_id", "session_id", "consumer_id", "product_id", "variant_id",
+                     "mode", "aroma_1to9", "flavor_1to9", "aftertaste_1to9", "acidity_1to9",
+                     "sweetness_1to9", "mouthfeel_1to9", "overall_liking_1to9", "notes",
+                     "standout_tags", "fit_tags", "consent_analytics", "consent_marketing", "created_at"]
+
+
+async def stream_csv(cursor, fieldnames):
+    """Encode cursor documents as CSV, yielding every EXPORT_CHUNK_ROWS rows."""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    rows = 0
+    async for r in cursor:
+        if r.get("standout_tags"):
+            r["standout_tags"] = "|".join(r["standout_tags"])
+        if r.get("fit_tags"):
+            r["fit_tags"] = "|".join(r["fit_tags"])
+        if isinstance(r.get("created_at"), datetime):
+            r["created_at"] = r["created_at"].isoformat()
+        writer.writerow(r)
+        rows += 1
+        if rows % EXPORT_CHUNK_ROWS == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    yield output.getvalue()
+
+
 @app.get("/api/admin/export.csv")
 async def admin_export_csv(
     request: Request,
@@ -615,42 +2063,557 @@ async def admin_export_csv(
     query = {}
     if product_id:
         query["product_id"] = product_id
-    if date_from or date_to:
-        date_q = {}
-        if date_from:
-            date_q["$gte"] = date_from
-        if date_to:
-            date_q["$lte"] = date_to
-        query["created_at"] = date_q
-
-    responses = await db.product_affective_responses.find(query, {"_id": 0}).to_list(50000)
+    query.update(time_range_query("created_at", date_from, date_to))
 
-    output = io.StringIO()
-    fieldnames = ["response_id", "session_id", "consumer_id", "product_id", "variant_id",
-                  "mode", "aroma_1to9", "flavor_1to9", "aftertaste_1to9", "acidity_1to9",
-                  "sweetness_1to9", "mouthfeel_1to9", "overall_liking_1to9", "notes",
-                  "standout_tags", "fit_tags", "consent_analytics", "consent_marketing", "created_at"]
-    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
-    writer.writeheader()
-    for r in responses:
-        row = {**r}
-        if row.get("standout_tags"):
-            row["standout_tags"] = "|".join(row["standout_tags"])
-        if row.get("fit_tags"):
-            row["fit_tags"] = "|".join(row["fit_tags"])
-        writer.writerow(row)
-
-    output.seek(0)
+    cursor = db.product_affective_responses.find(query, {"_id": 0}).batch_size(EXPORT_CHUNK_ROWS)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        stream_csv(cursor, EXPORT_CSV_FIELDS),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=affective_responses.csv"}
     )
 
 
+# --- Admin: Responses ---
+
+RESPONSE_PAGE_FIELDS = set(EXPORT_CSV_FIELDS)
+
+
+def response_page_query(after, order):
+    """Keyset filter continuing after the (created_at, response_id) of the previous page."""
+    created_at, response_id = decode_cursor(after, (parse_cursor_time, parse_cursor_str))
+    desc = order == "desc"
+    tiebreak = {"response_id": {"$lt" if desc else "$gt": response_id}}
+    return {"$or": time_keyset_clauses("created_at", created_at, desc, tiebreak)}
+
+
+@app.get("/api/admin/responses")
+async def admin_list_responses(
+    request: Request,
+    product_id: Optional[str] = None,
+    mode: Optional[str] = None,
+    min_liking: Optional[int] = Query(None, ge=1, le=9),
+    max_liking: Optional[int] = Query(None, ge=1, le=9),
+    has_notes: Optional[bool] = None,
+    fields: Optional[str] = None,
+    order: str = "desc",
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[str] = None,
+    user=Depends(require_admin_role)
+):
+    if order not in ("asc", "desc"):
+        raise HTTPException(422, "order must be asc or desc")
+    query = {}
+    if product_id:
+        query["product_id"] = product_id
+    if mode:
+        query["mode"] = mode
+    liking = {}
+    if min_liking is not None:
+        liking["$gte"] = min_liking
+    if max_liking is not None:
+        liking["$lte"] = max_liking
+    if liking:
+        query["overall_liking_1to9"] = liking
+    if has_notes is not None:
+        query["notes"] = {"$nin": [None, ""]} if has_notes else {"$in": [None, ""]}
+    if after:
+        query.update(response_page_query(after, order))
+
+    projection = {"_id": 0}
+    if fields:
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested - RESPONSE_PAGE_FIELDS
+        if unknown:
+            raise HTTPException(422, f"Unknown fields: {', '.join(sorted(unknown))}")
+        projection.update({f: 1 for f in requested | {"response_id", "created_at"}})
+
+    direction = -1 if order == "desc" else 1
+    cursor = db.product_affective_responses.find(query, projection) \
+        .sort([("created_at", direction), ("response_id", direction)]).limit(limit + 1)
+    rows = await cursor.to_list(limit + 1)
+
+    responses = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = responses[-1]
+        next_cursor = encode_cursor([cursor_time(last["created_at"]), last["response_id"]])
+    return {"responses": responses, "next": next_cursor}
+
+
+# --- Admin: Columnar Export ---
+
+EXPORT_ROW_GROUP_ROWS = 50000
+
+
+def columnar_schemas():
+    tags = pa.list_(pa.string())
+    timestamp = pa.timestamp("us", tz="UTC")
+    return {
+        "responses": pa.schema(
+            [(f, pa.string()) for f in ["response_id", "session_id", "consumer_id", "product_id", "variant_id", "mode"]]
+            + [(attr, pa.int8()) for attr in RESPONSE_ATTRS]
+            + [("notes", pa.string()), ("standout_tags", tags), ("standout_tags_source", pa.string()),
+               ("fit_tags", tags), ("consent_analytics", pa.bool_()), ("consent_marketing", pa.bool_()),
+               ("created_at", timestamp)]
+        ),
+        "events": pa.schema(
+            [(f, pa.string()) for f in ["event_id", "event_name"]]
+            + [("event_time", timestamp)]
+            + [(f, pa.string()) for f in ["actor_type", "session_id", "consumer_id", "source", "product_id", "variant_id"]]
+            + [("metadata", pa.string())]
+        ),
+    }
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain.
+
+    tell() reports the total bytes written so Parquet footer offsets stay valid.
+    """
+
+    def __init__(self):
+        self.position = 0
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self.position += len(b)
+        return len(b)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_columnar(cursor, schema, fmt):
+    """Encode cursor documents as Parquet or Arrow IPC, one row group at a time."""
+    sink = ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    else:
+        writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+    converters = {}
+    for field in schema:
+        if pa.types.is_timestamp(field.type):
+            converters[field.name] = as_datetime
+        elif field.name == "metadata":
+            converters[field.name] = lambda v: json.dumps(v, default=str) if v is not None else None
+    columns = {name: [] for name in schema.names}
+    rows = 0
+    async for doc in cursor:
+        for name, values in columns.items():
+            value = doc.get(name)
+            convert = converters.get(name)
+            values.append(convert(value) if convert else value)
+        rows += 1
+        if rows % EXPORT_ROW_GROUP_ROWS == 0:
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            columns = {name: [] for name in schema.names}
+            yield sink.drain()
+    if rows % EXPORT_ROW_GROUP_ROWS or not rows:
+        writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+async def admin_export_columnar(fmt, dataset, product_id, date_from, date_to):
+    if pa is None:
+        raise HTTPException(501, "Columnar export requires pyarrow")
+    if dataset not in ("responses", "events"):
+        raise HTTPException(422, "dataset must be responses or events")
+    collection, time_field = {
+        "responses": (db.product_affective_responses, "created_at"),
+        "events": (db.events, "event_time"),
+    }[dataset]
+    query = {}
+    if product_id:
+        query["product_id"] = product_id
+    query.update(time_range_query(time_field, date_from, date_to))
+
+    cursor = collection.find(query, {"_id": 0}).batch_size(EXPORT_CHUNK_ROWS)
+    extension, media_type = {
+        "parquet": ("parquet", "application/vnd.apache.parquet"),
+        "arrow": ("arrows", "application/vnd.apache.arrow.stream"),
+    }[fmt]
+    return StreamingResponse(
+        stream_columnar(cursor, columnar_schemas()[dataset], fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={dataset}.{extension}"}
+    )
+
+
+@app.get("/api/admin/export.parquet")
+async def admin_export_parquet(
+    request: Request,
+    dataset: str = "responses",
+    product_id: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    user=Depends(require_admin_role)
+):
+    return await admin_export_columnar("parquet", dataset, product_id, date_from, date_to)
+
+
+@app.get("/api/admin/export.arrow")
+async def admin_export_arrow(
+    request: Request,
+    dataset: str = "responses",
+    product_id: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    user=Depends(require_admin_role)
+):
+    return await admin_export_columnar("arrow", dataset, product_id, date_from, date_to)
+
+
+# --- Admin: Cache Stats ---
+
+@app.get("/api/admin/cache/stats")
+async def admin_cache_stats(request: Request, user=Depends(verify_viewer_token)):
+    return {"profile_cache": profile_cache.stats(), "admin_user_cache": admin_user_cache.stats()}
+
+
+# --- Admin: Profiles ---
+
+def find_request_profile(request_profile_id):
+    for record in recent_request_profiles:
+        if record["request_profile_id"] == request_profile_id:
+            return record
+    raise HTTPException(404, "Request profile not found or already evicted")
+
+
+@app.get("/api/admin/request-profiles")
+async def admin_list_request_profiles(user=Depends(require_admin_role)):
+    summary_fields = ("request_profile_id", "trigger", "method", "path", "query", "started_at", "status",
+                      "wall_ms", "loop_ms")
+    return {
+        "enabled": PROFILING_ENABLED,
+        "request_profiles": [{f: r[f] for f in summary_fields} for r in reversed(recent_request_profiles)]
+    }
+
+
+@app.get("/api/admin/request-profiles/{request_profile_id}")
+async def admin_get_request_profile(request_profile_id: str, user=Depends(require_admin_role)):
+    return {k: v for k, v in find_request_profile(request_profile_id).items() if k != "pstats"}
+
+
+@app.get("/api/admin/request-profiles/{request_profile_id}/pstats")
+async def admin_download_request_profile(request_profile_id: str, user=Depends(require_admin_role)):
+    """Raw pstats dump, for pstats.Stats(path) or snakeviz."""
+    return Response(
+        find_request_profile(request_profile_id)["pstats"],
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename=request-profile-{request_profile_id}.prof"}
+    )
+
+
+# --- Admin: Query Report ---
+
+INDEXED_COLLECTIONS = ["events", "consumer_taste_profiles", "product_affective_responses", "product_daily_stats",
+                       "product_response_stats", "products", "admin_users", "rate_limits"]
+
+
+def winning_plan_stages(explain):
+    """(stage, index name) for every plan stage in an explain, skipping rejected plans."""
+    stages = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "stage" in node:
+                stages.append((node["stage"], node.get("indexName")))
+            for key, child in node.items():
+                if key != "rejectedPlans":
+                    walk(child)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+    walk(explain)
+    return stages
+
+
+def slow_query_summary(entry):
+    return {
+        "collection": entry["collection"],
+        "command": entry["command"],
+        "shape": entry["shape"],
+        "count": entry["count"],
+        "total_ms": round(entry["total_ms"], 1),
+        "avg_ms": round(entry["total_ms"] / entry["count"], 1),
+        "max_ms": round(entry["max_ms"], 1),
+        "last_seen": entry["last_seen"],
+    }
+
+
+@app.get("/api/admin/slow-queries")
+async def admin_slow_queries(limit: int = Query(50, ge=1, le=SLOW_QUERY_MAX_SHAPES), user=Depends(require_admin_role)):
+    return {"threshold_ms": SLOW_QUERY_MS, "queries": [slow_query_summary(e) for e in slow_query_log.top(limit)]}
+
+
+@app.delete("/api/admin/slow-queries")
+async def admin_clear_slow_queries(user=Depends(require_admin_role)):
+    slow_query_log.clear()
+    return {"status": "ok"}
+
+
+@app.get("/api/admin/index-report")
+async def admin_index_report(top: int = Query(10, ge=1, le=50), user=Depends(require_admin_role)):
+    """Explain the slowest query shapes and list indexes nothing has used since the server started."""
+    queries = []
+    for entry in slow_query_log.top(top):
+        report = slow_query_summary(entry)
+        try:
+            explain = await db.command({"explain": entry["sample"], "verbosity": "queryPlanner"})
+            stages = winning_plan_stages(explain)
+            report["plan"] = [stage for stage, _ in stages]
+            report["indexes_used"] = sorted({index for _, index in stages if index})
+            report["collection_scan"] = any(stage == "COLLSCAN" for stage, _ in stages)
+        except Exception as e:
+            report["explain_error"] = str(e)
+        queries.append(report)
+
+    unused = []
+    for name in INDEXED_COLLECTIONS:
+        try:
+            stats = await db[name].aggregate([{"$indexStats": {}}]).to_list(None)
+        except Exception as e:
+            unused.append({"collection": name, "error": str(e)})
+            continue
+        for index in stats:
+            if index["name"] != "_id_" and index["accesses"]["ops"] == 0:
+                unused.append({"collection": name, "index": index["name"], "key": index["key"],
+                               "since": index["accesses"]["since"]})
+    return {
+        "threshold_ms": SLOW_QUERY_MS,
+        "queries": queries,
+        "collection_scans": [q for q in queries if q.get("collection_scan")],
+        "unused_indexes": unused,
+    }
+
+
+# --- Metrics Endpoint ---
+
+def metric_family(name, help, kind, samples):
+    yield f"# HELP {name} {help}"
+    yield f"# TYPE {name} {kind}"
+    for labels, value in samples:
+        yield f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+
+
+def state_metrics():
+    """Gauges and counters read off in-memory state at scrape time."""
+    caches = {"profile": profile_cache.stats(), "admin_user": admin_user_cache.stats()}
+    for name, field, kind, help in (
+        ("taste_fit_cache_entries", "size", "gauge", "Entries held"),
+        ("taste_fit_cache_hits_total", "hits", "counter", "Lookups served from the cache"),
+        ("taste_fit_cache_misses_total", "misses", "counter", "Lookups that missed the cache"),
+        ("taste_fit_cache_hit_ratio", "hit_ratio", "gauge", "hits / (hits + misses) since start"),
+    ):
+        yield from metric_family(name, help, kind, [
+            (metric_labels(("cache",), (cache,)), stats[field]) for cache, stats in caches.items()
+        ])
+    if isinstance(rate_limiter, MemoryRateLimitBackend):
+        yield from metric_family("taste_fit_rate_limit_keys", "Keys tracked by the in-memory rate limiter", "gauge",
+                                 [("", len(rate_limiter))])
+    events = event_ingestor.stats()
+    yield from metric_family("taste_fit_event_buffer_size", "Events waiting to be written", "gauge",
+                             [("", events["buffered"])])
+    yield from metric_family("taste_fit_events_written_total", "Events written to Mongo", "counter",
+                             [("", events["written"])])
+    yield from metric_family("taste_fit_events_dropped_total", "Events dropped by the ingestor", "counter",
+                             [("", events["dropped"])])
+    yield from metric_family("taste_fit_catalog_products", "Active products in the taste-fit index", "gauge",
+                             [("", len(catalog_index.products))])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(401, "Missing or invalid metrics token")
+    lines = [*request_latency.render(), *mongo_latency.render(), *rate_limit_rejections.render(), *state_metrics()]
+    return Response("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+
 # --- Admin: Privacy Delete ---
 
-@app.delete("/api/admin/data")
+PRIVACY_DELETE_TARGETS = [
+    ("profiles", "consumer_taste_profiles"),
+    ("responses", "product_affective_responses"),
+    ("events", "events"),
+]
+
+
+class PrivacyDeleter:
+    """Runs privacy deletion jobs queued in privacy_delete_jobs, one at a time.
+
+    Each job deletes from the three collections concurrently in batches of
+    batch_size, pausing between batches. Counts are $inc'ed onto the job
+    after every batch. A running job holds a lease that every batch renews;
+    if the process dies the lease lapses and any worker resumes the job,
+    which is safe because deleting what is left is idempotent.
+
+    The worker that ran a job drops the subject's cached profiles itself.
+    Every other worker watches the number of finished jobs, its deletion
+    epoch, every sync_seconds and clears its whole profile cache when it
+    moves, so a deleted profile is served for at most that long after the
+    job finishes.
+    """
+
+    def __init__(self, batch_size, pause, lease_seconds, sync_seconds):
+        self.batch_size = batch_size
+        self.pause = pause
+        self.lease_seconds = lease_seconds
+        self.sync_seconds = sync_seconds
+        self.db = None
+        self._tasks = []
+        self._job_id = None
+        self._epoch = None
+        self._wake = asyncio.Event()
+
+    def start(self, db):
+        self.db = db
+        self._tasks = [asyncio.create_task(self._run()), asyncio.create_task(self._watch_epoch())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._job_id:
+            # Hand the job straight back rather than making the next worker wait out the lease
+            await self.db.privacy_delete_jobs.update_one(
+                {"_id": self._job_id}, {"$set": {"lease_until": datetime.now(timezone.utc)}}
+            )
+            self._job_id = None
+
+    def wake(self):
+        self._wake.set()
+
+    def lease(self):
+        return datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+
+    async def _claim(self):
+        now = datetime.now(timezone.utc)
+        return await self.db.privacy_delete_jobs.find_one_and_update(
+            {"$or": [{"status": "queued"}, {"status": "running", "lease_until": {"$lt": now}}]},
+            {"$set": {"status": "running", "lease_until": self.lease()}, "$min": {"started_at": now}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _run(self):
+        while True:
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("Could not claim a privacy deletion job")
+                await asyncio.sleep(self.lease_seconds)
+                continue
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.lease_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+            self._job_id = job["_id"]
+            try:
+                await self._process(job)
+            except Exception as e:
+                logger.exception("Privacy deletion job %s failed", job["_id"])
+                await self.db.privacy_delete_jobs.update_one(
+                    {"_id": job["_id"]},
+                    {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.now(timezone.utc)}}
+                )
+            self._job_id = None
+
+    async def _watch_epoch(self):
+        while True:
+            try:
+                epoch = await self.db.privacy_delete_jobs.count_documents({"status": "done"})
+                if self._epoch is not None and epoch != self._epoch:
+                    profile_cache.clear()
+                self._epoch = epoch
+            except Exception:
+                logger.exception("Could not check the privacy deletion epoch")
+            await asyncio.sleep(self.sync_seconds)
+
+    async def _drain(self, job_id, name, collection, query):
+        while True:
+            batch = await self.db[collection].find(query, {"_id": 1}).limit(self.batch_size).to_list(self.batch_size)
+            if not batch:
+                return
+            result = await self.db[collection].delete_many({"_id": {"$in": [d["_id"] for d in batch]}})
+            await self.db.privacy_delete_jobs.update_one(
+                {"_id": job_id},
+                {"$inc": {f"deleted.{name}": result.deleted_count}, "$set": {"lease_until": self.lease()}}
+            )
+            await asyncio.sleep(self.pause)
+
+    async def _process(self, job):
+        query = job["query"]
+        # Buffered events for this subject must land before the delete, not after it
+        await event_ingestor.flush()
+        await asyncio.gather(*(
+            self._drain(job["_id"], name, collection, query) for name, collection in PRIVACY_DELETE_TARGETS
+        ))
+        # Only once the profiles are gone: a read before that would re-cache them
+        if query.get("session_id"):
+            profile_cache.invalidate(query["session_id"])
+        if query.get("consumer_id"):
+            profile_cache.invalidate_where(lambda p: p.get("consumer_id") == query["consumer_id"])
+
+        job = await self.db.privacy_delete_jobs.find_one({"_id": job["_id"]})
+        deleted = {name: job["deleted"].get(name, 0) for name, _ in PRIVACY_DELETE_TARGETS}
+        await self.db.events.insert_one({
+            "event_id": str(uuid.uuid4()),
+            "event_name": "data_deleted",
+            "event_time": datetime.now(timezone.utc),
+            "actor_type": "internal_ops",
+            "session_id": query.get("session_id") or "",
+            "consumer_id": query.get("consumer_id"),
+            "source": "web",
+            "metadata": {
+                "deleted_by": job["requested_by"],
+                "job_id": job["_id"],
+                "profiles_deleted": deleted["profiles"],
+                "responses_deleted": deleted["responses"],
+                "events_deleted": deleted["events"]
+            }
+        })
+        await self.db.privacy_delete_jobs.update_one(
+            {"_id": job["_id"]}, {"$set": {"status": "done", "finished_at": datetime.now(timezone.utc)}}
+        )
+
+
+privacy_deleter = PrivacyDeleter(PRIVACY_DELETE_BATCH_SIZE, PRIVACY_DELETE_PAUSE_SECONDS, PRIVACY_DELETE_LEASE_SECONDS,
+                                 PRIVACY_CACHE_SYNC_SECONDS)
+
+
+def privacy_job_view(job):
+    return {
+        "job_id": job["_id"],
+        "status": job["status"],
+        "query": job["query"],
+        "requested_by": job["requested_by"],
+        "created_at": job["created_at"],
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+        "deleted": {name: job["deleted"].get(name, 0) for name, _ in PRIVACY_DELETE_TARGETS},
+        "error": job.get("error"),
+    }
+
+
+@app.delete("/api/admin/data", status_code=202)
 async def admin_delete_data(
     request: Request,
     session_id: Optional[str] = None,
@@ -666,31 +2629,28 @@ async def admin_delete_data(
     if consumer_id:
         query["consumer_id"] = consumer_id
 
-    profile_result = await db.consumer_taste_profiles.delete_many(query)
-    response_result = await db.product_affective_responses.delete_many(query)
-    event_result = await db.events.delete_many(query)
+    job = {
+        "_id": str(uuid.uuid4()),
+        "status": "queued",
+        "query": query,
+        "requested_by": user["email"],
+        "created_at": datetime.now(timezone.utc),
+        "deleted": {name: 0 for name, _ in PRIVACY_DELETE_TARGETS},
+    }
+    await db.privacy_delete_jobs.insert_one(job)
+    privacy_deleter.wake()
+    return {"status": "queued", "job_id": job["_id"]}
 
-    await db.events.insert_one({
-        "event_id": str(uuid.uuid4()),
-        "event_name": "data_deleted",
-        "event_time": datetime.now(timezone.utc).isoformat(),
-        "actor_type": "internal_ops",
-        "session_id": session_id or "",
-        "consumer_id": consumer_id,
-        "source": "web",
-        "metadata": {
-            "deleted_by": user["email"],
-            "profiles_deleted": profile_result.deleted_count,
-            "responses_deleted": response_result.deleted_count,
-            "events_deleted": event_result.deleted_count
-        }
-    })
 
-    return {
-        "status": "ok",
-        "deleted": {
-            "profiles": profile_result.deleted_count,
-            "responses": response_result.deleted_count,
-            "events": event_result.deleted_count
-        }
-    }
+@app.get("/api/admin/data/jobs")
+async def admin_list_delete_jobs(limit: int = Query(50, ge=1, le=500), user=Depends(require_admin_role)):
+    jobs = await db.privacy_delete_jobs.find({}).sort("created_at", -1).limit(limit).to_list(limit)
+    return {"jobs": [privacy_job_view(j) for j in jobs]}
+
+
+@app.get("/api/admin/data/jobs/{job_id}")
+async def admin_get_delete_job(job_id: str, user=Depends(require_admin_role)):
+    job = await db.privacy_delete_jobs.find_one({"_id": job_id})
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return privacy_job_view(job)
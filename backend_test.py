@@ -6,7 +6,8 @@ import requests
 import json
 import sys
 import uuid
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 
 
 class TasteFitAPITester:
@@ -303,6 +304,35 @@ class TasteFitAPITester:
             self.log_test("Create Event", False, str(e))
             return False
 
+    def test_create_events_batch(self):
+        """Test bulk event endpoint with per-event results"""
+        try:
+            payload = {
+                "events": [
+                    {
+                        "event_name": "affective_form_viewed",
+                        "session_id": self.session_id,
+                        "product_id": "papayo-natural"
+                    },
+                    {"session_id": self.session_id}  # missing event_name
+                ]
+            }
+            response = requests.post(
+                f"{self.base_url}/api/events/batch",
+                json=payload,
+                timeout=10
+            )
+            success = response.status_code == 200
+            if success:
+                data = response.json()
+                statuses = [r["status"] for r in data.get("results", [])]
+                success = data.get("accepted") == 1 and statuses == ["accepted", "invalid"]
+            self.log_test("Create Events Batch", success, f"Status: {response.status_code}")
+            return success
+        except Exception as e:
+            self.log_test("Create Events Batch", False, str(e))
+            return False
+
     def test_admin_products(self):
         """Test admin products endpoint"""
         if not self.admin_token:
@@ -325,6 +355,177 @@ class TasteFitAPITester:
             self.log_test("Admin Products", False, str(e))
             return False
 
+    def test_admin_products_paging(self):
+        """Test admin products search and cursor paging"""
+        if not self.admin_token:
+            self.log_test("Admin Products Paging", False, "No admin token available")
+            return False
+        try:
+            headers = {"Authorization": f"Bearer {self.admin_token}"}
+            response = requests.get(
+                f"{self.base_url}/api/admin/products?limit=1&sort=response_count",
+                headers=headers,
+                timeout=10
+            )
+            success = response.status_code == 200
+            if success:
+                data = response.json()
+                success = "next" in data and len(data["products"]) <= 1
+                if success and data["next"]:
+                    page = requests.get(
+                        f"{self.base_url}/api/admin/products?limit=1&sort=response_count&after={data['next']}",
+                        headers=headers,
+                        timeout=10
+                    ).json()
+                    success = all(p["product_id"] != data["products"][0]["product_id"] for p in page["products"])
+            self.log_test("Admin Products Paging", success, f"Status: {response.status_code}")
+            return success
+        except Exception as e:
+            self.log_test("Admin Products Paging", False, str(e))
+            return False
+
+    def test_admin_responses(self):
+        """Test admin raw response browsing with keyset paging"""
+        if not self.admin_token:
+            self.log_test("Admin Responses", False, "No admin token available")
+            return False
+        try:
+            headers = {"Authorization": f"Bearer {self.admin_token}"}
+            response = requests.get(
+                f"{self.base_url}/api/admin/responses?product_id=papayo-natural&fields=mode,notes&limit=2",
+                headers=headers,
+                timeout=10
+            )
+            success = response.status_code == 200
+            if success:
+                data = response.json()
+                success = "next" in data and len(data["responses"]) <= 2 and all(
+                    set(r) <= {"response_id", "created_at", "mode", "notes"} for r in data["responses"]
+                )
+                if success and data["next"]:
+                    page = requests.get(
+                        f"{self.base_url}/api/admin/responses?product_id=papayo-natural&limit=2&after={data['next']}",
+                        headers=headers,
+                        timeout=10
+                    ).json()
+                    seen = {r["response_id"] for r in data["responses"]}
+                    success = all(r["response_id"] not in seen for r in page["responses"])
+            if success and self.viewer_token:
+                # Raw rows carry consumer ids and notes: admin-only, like the exports
+                viewer = requests.get(
+                    f"{self.base_url}/api/admin/responses?limit=1",
+                    headers={"Authorization": f"Bearer {self.viewer_token}"},
+                    timeout=10
+                )
+                success = viewer.status_code == 403
+            self.log_test("Admin Responses", success, f"Status: {response.status_code}")
+            return success
+        except Exception as e:
+            self.log_test("Admin Responses", False, str(e))
+            return False
+
+    def test_admin_conditional_get(self):
+        """Test admin analytics answer 304 to a current ETag"""
+        if not self.admin_token:
+            self.log_test("Admin Conditional GET", False, "No admin token available")
+            return False
+        try:
+            headers = {"Authorization": f"Bearer {self.admin_token}"}
+            response = requests.get(
+                f"{self.base_url}/api/admin/funnel",
+                headers=headers,
+                timeout=10
+            )
+            etag = response.headers.get("ETag")
+            success = response.status_code == 200 and etag is not None
+            if success:
+                cached = requests.get(
+                    f"{self.base_url}/api/admin/funnel",
+                    headers={**headers, "If-None-Match": etag},
+                    timeout=10
+                )
+                success = cached.status_code == 304 and not cached.content
+            self.log_test("Admin Conditional GET", success, f"Status: {response.status_code}")
+            return success
+        except Exception as e:
+            self.log_test("Admin Conditional GET", False, str(e))
+            return False
+
+    def test_admin_request_profiles(self):
+        """Test admin request profile listing"""
+        if not self.admin_token:
+            self.log_test("Admin Request Profiles", False, "No admin token available")
+            return False
+        try:
+            headers = {"Authorization": f"Bearer {self.admin_token}"}
+            response = requests.get(
+                f"{self.base_url}/api/admin/request-profiles",
+                headers=headers,
+                timeout=10
+            )
+            success = response.status_code == 200
+            if success:
+                data = response.json()
+                success = "enabled" in data and isinstance(data["request_profiles"], list)
+            self.log_test("Admin Request Profiles", success, f"Status: {response.status_code}")
+            return success
+        except Exception as e:
+            self.log_test("Admin Request Profiles", False, str(e))
+            return False
+
+    def test_admin_index_report(self):
+        """Test slow query log and index report"""
+        if not self.admin_token:
+            self.log_test("Admin Index Report", False, "No admin token available")
+            return False
+        try:
+            headers = {"Authorization": f"Bearer {self.admin_token}"}
+            response = requests.get(
+                f"{self.base_url}/api/admin/index-report?top=5",
+                headers=headers,
+                timeout=30
+            )
+            success = response.status_code == 200
+            if success:
+                data = response.json()
+                success = all(k in data for k in ("queries", "collection_scans", "unused_indexes"))
+            self.log_test("Admin Index Report", success, f"Status: {response.status_code}")
+            return success
+        except Exception as e:
+            self.log_test("Admin Index Report", False, str(e))
+            return False
+
+    def test_admin_delete_job(self):
+        """Test privacy deletion runs as a background job"""
+        if not self.admin_token:
+            self.log_test("Admin Delete Job", False, "No admin token available")
+            return False
+        try:
+            headers = {"Authorization": f"Bearer {self.admin_token}"}
+            response = requests.delete(
+                f"{self.base_url}/api/admin/data?session_id=delete-job-{uuid.uuid4()}",
+                headers=headers,
+                timeout=10
+            )
+            success = response.status_code == 202
+            if success:
+                job_id = response.json()["job_id"]
+                for _ in range(30):
+                    job = requests.get(
+                        f"{self.base_url}/api/admin/data/jobs/{job_id}",
+                        headers=headers,
+                        timeout=10
+                    ).json()
+                    if job["status"] not in ("queued", "running"):
+                        break
+                    time.sleep(1)
+                success = job["status"] == "done"
+            self.log_test("Admin Delete Job", success, f"Status: {response.status_code}")
+            return success
+        except Exception as e:
+            self.log_test("Admin Delete Job", False, str(e))
+            return False
+
     def test_admin_product_summary(self):
         """Test admin product summary endpoint"""
         if not self.admin_token:
@@ -347,6 +548,46 @@ class TasteFitAPITester:
             self.log_test("Admin Product Summary", False, str(e))
             return False
 
+    def test_admin_summary_to_whole_day(self):
+        """Test a date-only `to` includes responses from that whole day"""
+        if not self.admin_token:
+            self.log_test("Admin Summary To Whole Day", False, "No admin token available")
+            return False
+        try:
+            headers = {"Authorization": f"Bearer {self.admin_token}"}
+            today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            # The response tests above submitted papayo-natural responses today
+            response = requests.get(
+                f"{self.base_url}/api/admin/products/summary?product_id=papayo-natural&to={today}",
+                headers=headers,
+                timeout=10
+            )
+            success = response.status_code == 200 and response.json().get("count", 0) >= 1
+            self.log_test("Admin Summary To Whole Day", success, f"Status: {response.status_code}")
+            return success
+        except Exception as e:
+            self.log_test("Admin Summary To Whole Day", False, str(e))
+            return False
+
+    def test_admin_summary_bad_date(self):
+        """Test a malformed date filter is rejected with 422"""
+        if not self.admin_token:
+            self.log_test("Admin Summary Bad Date", False, "No admin token available")
+            return False
+        try:
+            headers = {"Authorization": f"Bearer {self.admin_token}"}
+            response = requests.get(
+                f"{self.base_url}/api/admin/products/summary?product_id=papayo-natural&from=bogus",
+                headers=headers,
+                timeout=10
+            )
+            success = response.status_code == 422
+            self.log_test("Admin Summary Bad Date (422)", success, f"Status: {response.status_code}")
+            return success
+        except Exception as e:
+            self.log_test("Admin Summary Bad Date (422)", False, str(e))
+            return False
+
     def test_admin_segments(self):
         """Test admin segments endpoint"""
         if not self.admin_token:
@@ -581,6 +822,43 @@ class TasteFitAPITester:
             self.log_test("Taste-Fit Batch (No Profile)", False, str(e))
             return False
 
+    def test_taste_fit_top(self):
+        """Test top-K taste-fit endpoint against the server-side catalog"""
+        try:
+            # Ensure profile and at least one catalog product exist first
+            self.test_create_profile()
+            requests.put(
+                f"{self.base_url}/api/admin/catalog/papayo-natural",
+                json={
+                    "title": "Papayo Natural",
+                    "sensory": {
+                        "aroma": 7, "flavor": 8, "aftertaste": 7,
+                        "acidity": 6, "sweetness": 8, "mouthfeel": 7
+                    }
+                },
+                headers={"Authorization": f"Bearer {self.admin_token}"},
+                timeout=10
+            )
+            response = requests.get(
+                f"{self.base_url}/api/affective/taste-fit/top",
+                params={"session_id": self.session_id, "k": 3},
+                timeout=10
+            )
+            success = response.status_code == 200
+            if success:
+                data = response.json()
+                scores = [p["score"] for p in data.get("products", [])]
+                success = (
+                    data.get("profile_exists") == True and
+                    0 < len(scores) <= 3 and
+                    scores == sorted(scores, reverse=True)
+                )
+            self.log_test("Taste-Fit Top-K", success, f"Status: {response.status_code}")
+            return success
+        except Exception as e:
+            self.log_test("Taste-Fit Top-K", False, str(e))
+            return False
+
     def run_all_tests(self):
         """Run all backend tests"""
         print(f"🚀 Starting Unchained Coffee Taste Fit API Tests")
@@ -612,19 +890,30 @@ class TasteFitAPITester:
 
         # Event tests
         self.test_create_event()
+        self.test_create_events_batch()
 
         # Admin dashboard tests (require admin login to be successful)
         if self.admin_token:
             self.test_admin_products()
+            self.test_admin_products_paging()
+            self.test_admin_responses()
             self.test_admin_product_summary()
+            self.test_admin_summary_to_whole_day()
+            self.test_admin_summary_bad_date()
             self.test_admin_segments()
             self.test_admin_funnel()
+            self.test_admin_conditional_get()
+            self.test_admin_request_profiles()
+            self.test_admin_index_report()
+            self.test_admin_delete_job()
 
         # NEW: Taste-Fit Score tests
         self.test_taste_fit_score_with_profile()
         self.test_taste_fit_score_no_profile()
         self.test_taste_fit_batch_with_profile()
         self.test_taste_fit_batch_no_profile()
+        if self.admin_token:
+            self.test_taste_fit_top()
 
         # Results
         print("=" * 60)
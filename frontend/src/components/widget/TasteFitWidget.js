@@ -3,7 +3,7 @@ import { Coffee, Zap, CheckCircle, Loader2 } from 'lucide-react';
 import AffectiveScale from './AffectiveScale';
 import TagChips from './TagChips';
 import ConsentToggles from './ConsentToggles';
-import { apiCall } from '../../utils/api';
+import { apiCall, trackEvent } from '../../utils/api';
 import { useSessionId } from '../../hooks/useSessionId';
 import { CANONICAL_TAGS, PROCESS_TAGS, FIT_ISSUE_TAGS } from '../../data/mockProducts';
 
@@ -56,29 +56,23 @@ export default function TasteFitWidget({ productId, variantId, productHandle, ta
 
   useEffect(() => {
     fetchProfile();
-    apiCall('/api/events', {
-      method: 'POST',
-      body: JSON.stringify({
-        event_name: 'affective_form_viewed',
-        session_id: sessionId,
-        product_id: productId,
-      }),
-    }).catch(() => {});
+    trackEvent({
+      event_name: 'affective_form_viewed',
+      session_id: sessionId,
+      product_id: productId,
+    });
   }, [sessionId, productId, fetchProfile]);
 
   const handleModeChange = (newMode) => {
     setMode(newMode);
     setSubmitted(false);
     setError(null);
-    apiCall('/api/events', {
-      method: 'POST',
-      body: JSON.stringify({
-        event_name: 'affective_form_opened',
-        session_id: sessionId,
-        product_id: productId,
-        metadata: { mode: newMode },
-      }),
-    }).catch(() => {});
+    trackEvent({
+      event_name: 'affective_form_opened',
+      session_id: sessionId,
+      product_id: productId,
+      metadata: { mode: newMode },
+    });
   };
 
   const handleRatingChange = (key, value) => {
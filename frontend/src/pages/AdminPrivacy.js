@@ -25,9 +25,16 @@ export default function AdminPrivacy() {
     try {
       const params = new URLSearchParams({ [idType]: identifier.trim() });
       const res = await adminApiCall(`/api/admin/data?${params}`, { method: 'DELETE' });
-      const data = await res.json();
-      setResult(data.deleted);
+      const { job_id } = await res.json();
       setConfirmOpen(false);
+      // Deletion runs as a background job; poll it, showing counts as they grow
+      let job;
+      do {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        job = await (await adminApiCall(`/api/admin/data/jobs/${job_id}`)).json();
+        setResult({ ...job.deleted, done: job.status === 'done' });
+      } while (job.status === 'queued' || job.status === 'running');
+      if (job.status === 'failed') setError(job.error || 'Deletion failed');
     } catch (err) {
       if (err.message === 'Not authenticated') return navigate('/admin/login');
       setError(err.message || 'Deletion failed');
@@ -112,8 +119,12 @@ export default function AdminPrivacy() {
           {result && (
             <div className="bg-green-50 border border-green-200 rounded-lg px-4 py-3" data-testid="privacy-success">
               <div className="flex items-center gap-2 mb-2">
-                <CheckCircle size={16} className="text-green-600" />
-                <span className="text-xs font-medium text-green-700">Data deleted successfully</span>
+                {result.done
+                  ? <CheckCircle size={16} className="text-green-600" />
+                  : <Loader2 size={16} className="text-green-600 animate-spin" />}
+                <span className="text-xs font-medium text-green-700">
+                  {result.done ? 'Data deleted successfully' : 'Deleting data...'}
+                </span>
               </div>
               <div className="text-xs text-green-700 space-y-0.5 font-mono">
                 <p>Profiles: {result.profiles}</p>
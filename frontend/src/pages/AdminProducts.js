@@ -8,21 +8,28 @@ export default function AdminProducts() {
   const navigate = useNavigate();
   const [products, setProducts] = useState([]);
   const [search, setSearch] = useState('');
+  const [next, setNext] = useState(null);
   const [loading, setLoading] = useState(true);
 
+  const fetchProducts = async (after) => {
+    const params = new URLSearchParams();
+    if (search) params.set('search', search);
+    if (after) params.set('after', after);
+    try {
+      const res = await adminApiCall(`/api/admin/products?${params}`);
+      const data = await res.json();
+      setProducts(prev => after ? [...prev, ...data.products] : data.products);
+      setNext(data.next);
+    } catch (err) {
+      if (err.message === 'Not authenticated') navigate('/admin/login');
+    } finally {
+      setLoading(false);
+    }
+  };
+
   useEffect(() => {
-    const fetchProducts = async () => {
-      try {
-        const res = await adminApiCall(`/api/admin/products${search ? `?search=${search}` : ''}`);
-        const data = await res.json();
-        setProducts(data.products);
-      } catch (err) {
-        if (err.message === 'Not authenticated') navigate('/admin/login');
-      } finally {
-        setLoading(false);
-      }
-    };
-    fetchProducts();
+    fetchProducts(null);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [search, navigate]);
 
   return (
@@ -89,6 +96,15 @@ export default function AdminProducts() {
                 ))}
               </tbody>
             </table>
+            {next && (
+              <button
+                onClick={() => fetchProducts(next)}
+                data-testid="load-more-products"
+                className="w-full py-3 text-sm font-medium text-[var(--a-primary)] border-t border-[var(--a-border)] hover:bg-gray-50"
+              >
+                Load more
+              </button>
+            )}
           </div>
         )}
       </div>
@@ -5,7 +5,7 @@ import TasteFitWidget from '../components/widget/TasteFitWidget';
 import TasteFitScore from '../components/widget/TasteFitScore';
 import BottomDrawer from '../components/widget/BottomDrawer';
 import { MOCK_PRODUCTS } from '../data/mockProducts';
-import { apiCall } from '../utils/api';
+import { trackEvent } from '../utils/api';
 import { useSessionId } from '../hooks/useSessionId';
 
 function SensoryBar({ label, value, maxValue = 9 }) {
@@ -44,15 +44,12 @@ export default function DemoPDP() {
   useEffect(() => {
     if (product) {
       setSelectedVariant(product.variants[0]);
-      apiCall('/api/events', {
-        method: 'POST',
-        body: JSON.stringify({
-          event_name: 'product_viewed',
-          session_id: sessionId,
-          product_id: product.id,
-          metadata: { handle: product.handle },
-        }),
-      }).catch(() => {});
+      trackEvent({
+        event_name: 'product_viewed',
+        session_id: sessionId,
+        product_id: product.id,
+        metadata: { handle: product.handle },
+      });
     }
   }, [product, sessionId]);
 
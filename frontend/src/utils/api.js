@@ -37,3 +37,37 @@ export async function adminApiCall(path, options = {}) {
     },
   }, 1);
 }
+
+let pendingEvents = [];
+let flushTimer = null;
+
+function flushEvents(keepalive = false) {
+  const events = pendingEvents;
+  pendingEvents = [];
+  clearTimeout(flushTimer);
+  flushTimer = null;
+  if (!events.length) return;
+  // keepalive lets the request outlive the page; there is no one left to retry it
+  apiCall('/api/events/batch', {
+    method: 'POST',
+    body: JSON.stringify({ events }),
+    keepalive,
+  }, keepalive ? 1 : 3).catch(() => {});
+}
+
+// Queue an analytics event; events fired close together go out as one batch request.
+export function trackEvent(event) {
+  pendingEvents.push(event);
+  if (pendingEvents.length >= 100) {
+    flushEvents();
+  } else if (!flushTimer) {
+    flushTimer = setTimeout(flushEvents, 250);
+  }
+}
+
+// Send whatever is still waiting on the batch window when the tab is hidden or left,
+// so a product_viewed fired just before navigating away isn't dropped
+window.addEventListener('pagehide', () => flushEvents(true));
+document.addEventListener('visibilitychange', () => {
+  if (document.visibilityState === 'hidden') flushEvents(true);
+});